@@ -0,0 +1,102 @@
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from agents import Agent, FunctionTool
+
+
+# ------------------------------
+# Agents built once at startup
+# ------------------------------
+# Building an Agent in every message handler repeats the same setup on the hot
+# path. Instead each agent is built once when the app starts, registered here
+# under its name, and handlers only look it up.
+#
+# A FunctionTool's JSON schema is generated when @function_tool runs, at import
+# time, so a registered agent carries precomputed schemas. ``freeze`` makes the
+# registry read-only, and with it each agent's tool list and tool schemas, so no
+# handler can swap an agent, its tools or a schema mid-flight. Agents are shared
+# by every session, so a change made by one handler would reach all of them.
+
+
+class FrozenDict(dict):
+    """
+    A dict that refuses changes. Still a dict, so the SDK and the JSON encoder
+    of the request take it as it is; copies of it are plain dicts again.
+    """
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("A frozen tool schema can't be changed")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class FrozenList(list):
+    """
+    A list that refuses changes. Still a list, since Agent checks that its
+    tools are one (e.g. in ``Agent.clone``); copies of it are plain lists again.
+    """
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("A frozen agent's tools can't be changed")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+def freeze_schema(value: Any) -> Any:
+    """Read-only copy of a JSON schema: dicts become FrozenDicts, lists tuples."""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze_schema(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze_schema(item) for item in value)
+    return value
+
+
+class AgentRegistry:
+    """
+    Name -> Agent lookup, filled at startup and then frozen.
+    """
+
+    def __init__(self):
+        self._agents: dict[str, Agent] | Mapping[str, Agent] = {}
+        self._frozen = False
+
+    def register(self, agent: Agent) -> Agent:
+        if self._frozen:
+            raise RuntimeError(f"Cannot register agent '{agent.name}': the registry is frozen")
+        if agent.name in self._agents:
+            raise ValueError(f"Agent '{agent.name}' is already registered")
+        tool_names = [tool.name for tool in agent.tools if isinstance(tool, FunctionTool)]
+        if len(tool_names) != len(set(tool_names)):
+            # fail at startup rather than on the first message that calls the tool
+            raise ValueError(f"Agent '{agent.name}' has duplicate tool names: {tool_names}")
+        self._agents[agent.name] = agent
+        return agent
+
+    def freeze(self) -> None:
+        for agent in self._agents.values():
+            for tool in agent.tools:
+                if isinstance(tool, FunctionTool):
+                    tool.params_json_schema = freeze_schema(tool.params_json_schema)
+            agent.tools = FrozenList(agent.tools)
+        self._agents = MappingProxyType(dict(self._agents))
+        self._frozen = True
+
+    def get(self, name: str) -> Agent:
+        try:
+            return self._agents[name]
+        except KeyError:
+            raise KeyError(f"No agent named '{name}', registered: {', '.join(self._agents)}") from None
+
+    def names(self) -> list[str]:
+        return list(self._agents)
+
+
+registry = AgentRegistry()
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark of the per-message agent setup in handle_message.
+
+    uv run bench_agent_setup.py
+
+before   : a new Agent built in every handler call (the old handle_message)
+before+  : the same, with the tools also decorated per call (schema generation)
+after    : the agent looked up in the startup registry
+"""
+import timeit
+
+from agents import Agent, function_tool
+
+from agent_registry import AgentRegistry
+
+ROUNDS = 20_000
+
+
+async def get_weather(location: str) -> str:
+    """fetch the weather for the given location"""
+    return f"weather in {location} is 22 degree celcius"
+
+
+async def mit_programmer_finder(number: str) -> str:
+    """Find the mit_programmer based on the their number"""
+    return "arslan"
+
+
+INSTRUCTIONS = "You only respond with haikus , Use get_weather tool to share the temperature of any location"
+TOOLS = [function_tool(get_weather), function_tool(mit_programmer_finder)]
+
+registry = AgentRegistry()
+registry.register(Agent(name="too calling", instructions=INSTRUCTIONS, tools=TOOLS))
+registry.freeze()
+
+
+def build_agent() -> Agent:
+    return Agent(name="too calling", instructions=INSTRUCTIONS, tools=TOOLS)
+
+
+def build_agent_and_tools() -> Agent:
+    return Agent(
+        name="too calling",
+        instructions=INSTRUCTIONS,
+        tools=[function_tool(get_weather), function_tool(mit_programmer_finder)],
+    )
+
+
+def lookup_agent() -> Agent:
+    return registry.get("too calling")
+
+
+if __name__ == "__main__":
+    for label, fn in [("before", build_agent), ("before+", build_agent_and_tools), ("after", lookup_agent)]:
+        best = min(timeit.repeat(fn, number=ROUNDS, repeat=5)) / ROUNDS
+        print(f"{label:<8} {best * 1e6:10.2f} us per message")
@@ -1,26 +1,24 @@
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,  function_tool
+from agents import Agent, Runner, AsyncOpenAI, RunConfig, ItemHelpers ,  function_tool
 import chainlit as cl
 from openai.types.responses import ResponseTextDeltaEvent
 import asyncio
-import os
 import random
 from dotenv import load_dotenv
+from token_coalescer import TokenCoalescer
+from agent_registry import registry
+from agent_common import AgentSummarizer, ConversationHistory, HedgedModel, SessionRuns, SingleFlightModel, get_client, get_model, llm_provider, stream_metrics
+from chainlit.server import app
 
 load_dotenv()
 
-# Load Gemini API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-provider: AsyncOpenAI = AsyncOpenAI(
-    api_key= GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+# one pooled client per process, shared with every other agent
+provider: AsyncOpenAI = get_client()
 
 #LLM model 
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-      model="gemini-2.5-flash",
-      openai_client= provider
-)
+#  calls still waiting after the p95 latency are hedged to gemini-2.0-flash, with failover when one trips its breaker
+routed_model: HedgedModel = HedgedModel(get_model("gemini-2.5-flash"), get_model("gemini-2.0-flash"))
+#  wrapped so identical requests from sessions at the same moment share one upstream call
+llm_model: SingleFlightModel = SingleFlightModel(routed_model)
 
 
 config = RunConfig(
@@ -147,45 +145,77 @@ async def mit_programmer_finder (number: str)-> str:
       return data.get( 2 ,"Not found")
 
 
+#  ==== agents, built once at startup =======
+HAIKU_AGENT = "too calling"
+
+registry.register(Agent(
+        name=HAIKU_AGENT,
+        instructions="You only respond with haikus , Use get_weather tool to share the temperature of any location",
+        tools=[get_weather , mit_programmer_finder],
+        model= llm_model
+         ))
+registry.freeze()
+
+#  a newer message of the same chat cancels the run still answering the previous one
+session_runs = SessionRuns()
+
+
 #  ==== stream the response with tool call using chainlit =======
 # message at the start of tha chat
 @cl.on_chat_start
 async def handle_chat_start():
      #  create the session for the history 
-    history = cl.user_session.set("history" , [])
+    #  only the recent turns that fit the token budget are kept, older ones are summarised in the background
+    cl.user_session.set("history" , ConversationHistory(summarizer=AgentSummarizer(llm_model)))
 
     await cl.Message(content = "Hello , I am tool tool call Agnet , how can i help you today").send()
 
 @cl.on_message
 async def handle_message(message: cl.Message):
-        history = cl.user_session.get("history")
+    async with session_runs.latest(cl.context.session.id):
+        history: ConversationHistory = cl.user_session.get("history")
         msg = cl.Message(content="")
         await msg.send()
         # user message
-        history.append({"role":"user" , "content": message.content})
+        history.add_user(message.content)
 
-        agent = Agent(
-        name="too calling",
-        instructions="You only respond with haikus , Use get_weather tool to share the temperature of any location",
-        tools=[get_weather , mit_programmer_finder],
-        model= llm_model
-         )
+        agent = registry.get(HAIKU_AGENT)
+        # TTFT, token gaps, tool call and run durations per agent / model
+        run = stream_metrics.start_run(agent, config)
         result = Runner.run_streamed(
             agent,
             # input = message.content, if no history 
-            input= history,
+            input= history.messages(),
             run_config= config
       )
         #  now the result is in the streamed 
-        async for event in result.stream_events():
-                if event.type == "raw_response_event" and isinstance(event.data , ResponseTextDeltaEvent):
-                        # print(event.data.delta , end = "" , flush= True)
-                        await msg.stream_token(event.data.delta)
+        #  deltas are batched (by size or every few ms) so each websocket frame carries more text
+        try:
+            async with TokenCoalescer(msg.stream_token) as tokens:
+                async for event in run.track(result.stream_events()):
+                        if event.type == "raw_response_event" and isinstance(event.data , ResponseTextDeltaEvent):
+                                # print(event.data.delta , end = "" , flush= True)
+                                await tokens.push(event.data.delta)
+        except asyncio.CancelledError:
+            #  the model call and pending tool calls run in the SDK's own task, stop them too
+            result.cancel()
+            raise
                         
                 
     #  hisroy of the agent response
-        history.append({"role":"assistant" , "content":result.final_output})
-        cl.user_session.set("history" , history)
+        history.add_assistant(result.final_output)
+
+
+#  latency histograms as JSON, e.g. curl localhost:8000/metrics/stream
+#  (also written to METRICS_DUMP_PATH every METRICS_DUMP_INTERVAL seconds)
+@app.get("/metrics/stream")
+async def get_stream_metrics():
+    return {
+        **stream_metrics.snapshot(),
+        "single_flight": llm_model.stats(),
+        "routing": routed_model.stats(),
+        "rate_limit": llm_provider.rate_limit_stats(),
+    }
         
 
 
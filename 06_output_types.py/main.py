@@ -1,6 +1,5 @@
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner
-import os
+from agents import Agent, Runner
+from agent_common import get_model
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from typing import List
@@ -8,13 +7,6 @@ from typing import List
 
 load_dotenv()
 
-gemini_api_key = os.getenv('GOOGLE_API_KEY')
-
-client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
 
 class Quiz(BaseModel):
      name: str
@@ -24,7 +16,7 @@ class Quiz(BaseModel):
 agent = Agent(
     name="Assistant",
     instructions="You are a Quiz Agent. You generate quizes",
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("gemini-2.0-flash"),
     output_type=Quiz
 )
 
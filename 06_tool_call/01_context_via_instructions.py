@@ -1,16 +1,9 @@
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner
-import os
+from agents import Agent, Runner
+from agent_common import get_model
 from dotenv import load_dotenv
 
 load_dotenv()
 
-GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-
-client = AsyncOpenAI(
-    api_key=GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
 
 hotel_info = """
 Welcome to the Grand Aurora Hotel, a prestigious five-star property situated in the vibrant downtown district of New Avalon. Our hotel redefines luxury through personalized service, elegant design, and modern functionality. Designed with both business travelers and leisure guests in mind, the Grand Aurora boasts 250 meticulously designed rooms, including 30 signature suites and 10 extended-stay luxury apartments. Every room features floor-to-ceiling windows, plush king or queen-size beds with premium linens, marble bathrooms, and complimentary high-speed Wi-Fi.
@@ -59,7 +52,7 @@ At Grand Aurora Hotel, we are proud to merge the sophistication of urban living
 agent = Agent(
     name="Hotel Assistant",
     instructions="You are Grand Aurora Hotel Assistant" + hotel_info.strip(),
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("gemini-2.0-flash"),
 )
 
 query = input("Ask your hotel-related question: ")
@@ -1,16 +1,9 @@
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
-import os
+from agents import Agent, Runner, function_tool
+from agent_common import get_model
 from dotenv import load_dotenv
 
 load_dotenv()
 
-gemini_api_key = os.getenv('GOOGLE_API_KEY')
-
-client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
 
 hotel_info = """
 Welcome to the Grand Aurora Hotel, a prestigious five-star property situated in the vibrant downtown district of New Avalon. Our hotel redefines luxury through personalized service, elegant design, and modern functionality. Designed with both business travelers and leisure guests in mind, the Grand Aurora boasts 250 meticulously designed rooms, including 30 signature suites and 10 extended-stay luxury apartments. Every room features floor-to-ceiling windows, plush king or queen-size beds with premium linens, marble bathrooms, and complimentary high-speed Wi-Fi.
@@ -64,7 +57,7 @@ def fetch_hotel_info() -> str:
 agent = Agent(
     name="Hotel Assistant",
     instructions="You are a helpful hotel assistant. Use the fetch_hotel_info tool to retrieve any necessary details about the Grand Aurora Hotel.",
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
+    model=get_model("gemini-2.0-flash"),
     tools=[fetch_hotel_info],
 )
 
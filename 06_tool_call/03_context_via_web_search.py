@@ -1,6 +1,6 @@
 from tavily import TavilyClient
-from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, function_tool
+from agents import Agent, Runner, function_tool
+from agent_common import get_model
 import os
 from dotenv import load_dotenv
 
@@ -10,14 +10,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Keys from your .env file
-gemini_api_key = os.getenv("GOOGLE_API_KEY")   # Gemini API key
 tavily_api_key = os.getenv("TAVILY_API_KEY")  # Tavily API key
 
-# Gemini client
-gemini_client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
 
 # Tavily client
 tavily_client = TavilyClient(api_key=tavily_api_key)
@@ -51,10 +45,7 @@ def web_search(query: str, max_results: int = 5) -> list:
 agent = Agent(
     name="Assistant",
     instructions="You are a helpful assistant. Use the web_search tool if needed.",
-    model=OpenAIChatCompletionsModel(
-        model="gemini-2.0-flash",
-        openai_client=gemini_client
-    ),
+    model=get_model("gemini-2.0-flash"),
     tools=[web_search],
 )
 
@@ -1,4 +1,3 @@
-import os
 import json
 from dotenv import load_dotenv
 from typing_extensions import TypedDict, Any
@@ -6,28 +5,19 @@ from typing_extensions import TypedDict, Any
 from agents import (
     Agent,
     Runner,
-    AsyncOpenAI,
     OpenAIChatCompletionsModel,
     RunContextWrapper,
     FunctionTool,
     function_tool
 )
+from agent_common import get_model
 
 # ------------------------------
-# Load API Key (Gemini via OpenAI client)
+# Load API Key, Gemini model from the shared provider
 # ------------------------------
 load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=external_client,
-)
+llm_model: OpenAIChatCompletionsModel = get_model("gemini-2.5-flash")
 
 
 # ------------------------------
@@ -2,21 +2,25 @@ import os
 import json
 from dotenv import load_dotenv
 from pydantic import BaseModel
-from typing_extensions import Any
+from typing_extensions import Any, Literal
 import asyncio
+import time
+from collections import OrderedDict
 import httpx 
 from bson import ObjectId
 from agents import (
     Agent,
     Runner,
-    AsyncOpenAI,
     OpenAIChatCompletionsModel,
     RunContextWrapper,
     FunctionTool,
     function_tool
 )
+from agent_common import get_model
 
-from pymongo.mongo_client import MongoClient
+from pymongo import AsyncMongoClient, ReturnDocument, ASCENDING, TEXT, InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.server_api import ServerApi
 
 # ------------------------------
@@ -27,30 +31,193 @@ load_dotenv()
 # ------------------------------
 # MongoDB Connection
 # ------------------------------
-uri = os.getenv("MONGO_URL")
-client = MongoClient(uri, server_api=ServerApi('1'))
+# The async client never blocks the event loop, so while one tool waits on the
+# database the other coroutines (other agent runs, other tool calls) keep going.
+# Pool sizes can be tuned per deployment through the environment.
+#
+# Nothing connects at import time: the client (and its DNS / SRV lookup) is
+# only created when a tool first needs it, and a forked worker builds its own
+# pool instead of sharing the parent's sockets.
+uri = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+MONGO_DB = os.getenv("MONGO_DB", "todo_agent")
+MONGO_COLLECTION = os.getenv("MONGO_COLLECTION", "agent")
+
+
+class MongoClientProvider:
+    """
+    Lazily created AsyncMongoClient, one per process and event loop.
+    """
+
+    def __init__(self, uri: str, **options: Any):
+        self.uri = uri
+        self.options = options
+        self._client: AsyncMongoClient | None = None
+        self._owner: tuple[int, asyncio.AbstractEventLoop] | None = None
+
+    def get(self) -> AsyncMongoClient:
+        """The client for the running process and event loop, created on first use."""
+        owner = (os.getpid(), asyncio.get_running_loop())
+        if self._client is None or self._owner != owner:
+            # an async client is tied to the loop it was first used on, and the
+            # one inherited over fork() shares sockets with the parent: never reuse either
+            self._client = AsyncMongoClient(self.uri, **self.options)
+            self._owner = owner
+        return self._client
+
+    def reset_after_fork(self) -> None:
+        # dropped, not closed: closing would shut the parent's connections too
+        self._client = None
+        self._owner = None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._owner = None
+
+
+mongo = MongoClientProvider(
+    uri,
+    server_api=ServerApi('1'),
+    maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000")),
+    waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+    serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+)
+os.register_at_fork(after_in_child=mongo.reset_after_fork)
+
+
+async def health_check() -> dict:
+    """
+    Ping the deployment. Returns {"ok": bool, "latency_ms": float, "error": str | None},
+    for readiness probes or a startup check that is allowed to wait on the database.
+    """
+    start = time.perf_counter()
+    try:
+        await mongo.get().admin.command('ping')
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": None}
+    except Exception as e:
+        return {"ok": False, "latency_ms": round((time.perf_counter() - start) * 1000, 2), "error": str(e)}
+
+
+# fetch_todos page size cap, and how many documents the server sends per batch
+MAX_PAGE_SIZE = 100
+BATCH_SIZE = int(os.getenv("MONGO_BATCH_SIZE", "100"))
+
+
+async def get_collection() -> AsyncCollection:
+    """The collection the To-Do tools read and write, with its indexes in place."""
+    collection = mongo.get()[MONGO_DB][MONGO_COLLECTION]
+    await ensure_indexes(collection)
+    return collection
 
-try:
-    client.admin.command('ping')
-    print("Pinged your deployment. Successfully connected to MongoDB!")
-except Exception as e:
-    print(e)
 
 # ------------------------------
-# Initialize OpenAI-compatible Gemini client
+# Indexes
 # ------------------------------
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Every lookup, update and delete filters on the title, so without an index on
+# it each one is a full collection scan. The text index serves word searches
+# over title and description.
+_indexes_ready = False
 
-external_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
 
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=external_client,
+async def ensure_indexes(collection: AsyncCollection) -> None:
+    """
+    Create the indexes the tools rely on. Called on first use of the
+    collection, only the first successful call talks to the server.
+    """
+    global _indexes_ready
+    if _indexes_ready:
+        return
+
+    try:
+        await collection.create_index([("title", ASCENDING)], name="title_unique", unique=True)
+    except OperationFailure as e:
+        # existing duplicate titles: the index can't be unique until they are cleaned up
+        print(f"Could not create unique index on title ({e}), using a non-unique one")
+        await collection.create_index([("title", ASCENDING)], name="title")
+    await collection.create_index([("title", TEXT), ("description", TEXT)], name="title_description_text")
+    _indexes_ready = True
+
+# ------------------------------
+# Read cache
+# ------------------------------
+# The model often asks for the same To-Do (or the same page) several times in
+# one conversation. Reads are served from a small LRU cache with a TTL; every
+# write tool invalidates the entries it could have made stale, so a cached
+# answer is never older than the last write made through these tools.
+# The TTL bounds staleness from writes made by other processes.
+class TodoReadCache:
+    """
+    Bounded LRU cache with per-entry TTL and hit / miss counters.
+
+    Pages are keyed by a generation number, so invalidating every cached
+    page is O(1): bump the generation and let the old entries age out.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._page_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def title_key(self, title: str) -> tuple:
+        return ("title", title)
+
+    def page_key(self, after: str | None, limit: int, search: str | None) -> tuple:
+        return ("page", self._page_generation, after, limit, search)
+
+    def invalidate_titles(self, *titles: str | None) -> None:
+        for title in titles:
+            if title is not None:
+                self._entries.pop(self.title_key(title), None)
+
+    def invalidate_pages(self) -> None:
+        self._page_generation += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+
+read_cache = TodoReadCache(
+    max_entries=int(os.getenv("MONGO_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("MONGO_CACHE_TTL_SECONDS", "30")),
 )
 
+# ------------------------------
+# Gemini model from the shared, pooled provider
+# ------------------------------
+llm_model: OpenAIChatCompletionsModel = get_model("gemini-2.5-flash")
+
 # ------------------------------
 # Input Schema for the Tool
 # ------------------------------
@@ -66,11 +233,29 @@ class TodoInput(BaseModel):
     description: str
 
 
+class BulkTodoOperation(BaseModel):
+    """
+    One operation of a bulk request.
+
+    Attributes:
+        action (str): "insert", "update" or "delete".
+        title (str): Title of the new To-Do (insert) or of the To-Do to change (update / delete).
+        description (str | None): Description of the new To-Do (insert only).
+        new_title (str | None): New title (update only).
+        new_description (str | None): New description (update only).
+    """
+    action: Literal["insert", "update", "delete"]
+    title: str
+    description: str | None = None
+    new_title: str | None = None
+    new_description: str | None = None
+
+
 # ------------------------------
 # Tool Function to Create a To-Do
 # ------------------------------
 @function_tool
-def create_todo(data: TodoInput) -> dict:
+async def create_todo(data: TodoInput) -> dict:
     """
     Create a new To-Do item and store it in MongoDB.
 
@@ -102,8 +287,7 @@ def create_todo(data: TodoInput) -> dict:
         str: Error message if creation fails.
     """
     try:
-        db = client["todo_agent"]
-        collection = db["agent"]
+        collection = await get_collection()
 
         new_todo = {
             "title": data.title,
@@ -111,13 +295,17 @@ def create_todo(data: TodoInput) -> dict:
         }
 
         # Insert into MongoDB
-        result = collection.insert_one(new_todo)
+        result = await collection.insert_one(new_todo)
+        read_cache.invalidate_pages()
 
         return {
             "id": str(result.inserted_id),
-            **new_todo
+            "title": data.title,
+            "description": data.description
         }
 
+    except DuplicateKeyError:
+        return f"Error in creating todo: a To-Do titled '{data.title}' already exists"
     except Exception as e:
         return f"Error in creating todo: {e}"
 
@@ -130,43 +318,77 @@ def create_todo(data: TodoInput) -> dict:
 # Tool Function to fetch all To-Dos
 # ------------------------------
 @function_tool
-def fetch_todos() -> list[dict]:
+async def fetch_todos(after: str | None = None, limit: int = 20, search: str | None = None) -> dict:
     """
-    Fetch all To-Do items from MongoDB.
+    Fetch one page of To-Do items from MongoDB.
 
     Purpose:
-        Retrieves all tasks stored in the 'todo' collection.
+        Retrieves the tasks stored in the 'agent' collection a page at a time,
+        so large collections never have to be loaded in one go.
 
     Input Arguments:
-        None
+        after (str | None): The "next_cursor" returned by the previous call,
+            leave empty to get the first page.
+        limit (int): How many To-Dos to return, at most 100.
+        search (str | None): Only return To-Dos whose title or description
+            contains these words.
 
     Behavior:
-        1. Connects to the 'todo_agent' database and 'todo' collection.
-        2. Retrieves all documents.
+        1. Connects to the 'todo_agent' database and 'agent' collection.
+        2. Reads the documents with an _id greater than `after`, in _id order,
+           with only title and description sent back by the server.
         3. Converts MongoDB ObjectId to string for readability.
-        4. Returns a list of dictionaries representing the tasks.
+        4. Returns the page and the cursor for the next one.
 
     Returns:
-        list[dict]: A list of todos, each containing:
-            - id (str): MongoDB ID
-            - title (str): Title of the task
-            - description (str): Description of the task
+        dict: {
+            "todos": list[dict],      # id, title and description of each task
+            "next_cursor": str | None # pass as `after` to get the next page, None on the last page
+        }
         OR
         str: Error message if fetching fails.
     """
     try:
-        db = client["todo_agent"]
-        collection = db["agent"]
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        cache_key = read_cache.page_key(after, limit, search)
+        cached = read_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        collection = await get_collection()
+
+        # keyset pagination: continue after the last _id instead of skipping,
+        # so every page is one index range scan however deep it is
+        query: dict = {}
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+        if search:
+            query["$text"] = {"$search": search}
+
+        # one extra document tells us whether there is a next page
+        cursor = (
+            collection.find(query, projection={"title": 1, "description": 1})
+            .sort("_id", ASCENDING)
+            .limit(limit + 1)
+            .batch_size(min(BATCH_SIZE, limit + 1))
+        )
 
         todos = []
-        for doc in collection.find():
+        async for doc in cursor:
             todos.append({
                 "id": str(doc["_id"]),
                 "title": doc["title"],
                 "description": doc["description"]
             })
 
-        return todos
+        next_cursor = None
+        if len(todos) > limit:
+            todos = todos[:limit]
+            next_cursor = todos[-1]["id"]
+
+        page = {"todos": todos, "next_cursor": next_cursor}
+        read_cache.put(cache_key, page)
+        return page
 
     except Exception as e:
         return f"Error in fetching todos: {e}"
@@ -176,7 +398,7 @@ def fetch_todos() -> list[dict]:
 # Tool Function to fetch single To-Do by Title
 # ------------------------------
 @function_tool
-def fetch_todo_by_title(title: str) -> dict:
+async def fetch_todo_by_title(title: str) -> dict:
     """
     Fetch a single To-Do item from MongoDB by its title.
 
@@ -203,21 +425,26 @@ def fetch_todo_by_title(title: str) -> dict:
             An error message if the task is not found or an error occurs.
     """
     try:
+        cached = read_cache.get(read_cache.title_key(title))
+        if cached is not None:
+            return cached
+
         # Connect to the database and collection
-        db = client["todo_agent"]
-        collection = db["agent"]
+        collection = await get_collection()
 
         # Search by title
-        doc = collection.find_one({"title": title})
+        doc = await collection.find_one({"title": title}, projection={"title": 1, "description": 1})
         if not doc:
             return f"No todo found with title: {title}"
 
         # Return structured dictionary
-        return {
+        todo = {
             "id": str(doc["_id"]),
             "title": doc["title"],
             "description": doc["description"]
         }
+        read_cache.put(read_cache.title_key(title), todo)
+        return todo
 
     except Exception as e:
         return f"Error in fetching todo: {e}"
@@ -226,7 +453,7 @@ def fetch_todo_by_title(title: str) -> dict:
 # Tool Function to Update To-Do by Title
 # ------------------------------
 @function_tool
-def update_todo_by_title(title: str, new_title: str | None = None, new_description: str | None = None) -> dict:
+async def update_todo_by_title(title: str, new_title: str | None = None, new_description: str | None = None) -> dict:
     """
     Update an existing To-Do item in MongoDB by matching its title.
 
@@ -255,8 +482,7 @@ def update_todo_by_title(title: str, new_title: str | None = None, new_descripti
         }
     """
     try:
-        db = client["todo_agent"]
-        collection = db["agent"]
+        collection = await get_collection()
 
         update_fields = {}
         if new_title:
@@ -267,25 +493,34 @@ def update_todo_by_title(title: str, new_title: str | None = None, new_descripti
         if not update_fields:
             return {"success": False, "message": "No fields provided to update.", "updated_doc": None}
 
-        result = collection.update_one(
+        # one indexed round trip: update and get the new version back together
+        updated_doc = await collection.find_one_and_update(
             {"title": title},
-            {"$set": update_fields}
+            {"$set": update_fields},
+            projection={"title": 1, "description": 1},
+            return_document=ReturnDocument.AFTER,
         )
 
-        if result.matched_count == 0:
+        if updated_doc is None:
             return {"success": False, "message": f"No To-Do found with title '{title}'.", "updated_doc": None}
 
-        # Fetch the updated document
-        updated_doc = collection.find_one({"title": update_fields.get("title", title)})
+        todo = {
+            "id": str(updated_doc["_id"]),
+            "title": updated_doc["title"],
+            "description": updated_doc["description"]
+        }
+        # the old title is gone, the new version is already in hand
+        read_cache.invalidate_titles(title)
+        read_cache.put(read_cache.title_key(todo["title"]), todo)
+        read_cache.invalidate_pages()
+
         return {
             "success": True,
             "message": "To-Do updated successfully.",
-            "updated_doc": {
-                "id": str(updated_doc["_id"]),
-                "title": updated_doc["title"],
-                "description": updated_doc["description"]
-            }
+            "updated_doc": todo
         }
+    except DuplicateKeyError:
+        return {"success": False, "message": f"A To-Do titled '{new_title}' already exists.", "updated_doc": None}
     except Exception as e:
         return {"success": False, "message": f"Error: {str(e)}", "updated_doc": None}
 
@@ -293,7 +528,7 @@ def update_todo_by_title(title: str, new_title: str | None = None, new_descripti
 # Tool Function to Delete To-Do by Title
 # ------------------------------
 @function_tool
-def delete_todo_by_title(title: str) -> dict:
+async def delete_todo_by_title(title: str) -> dict:
     """
     Delete an existing To-Do item from MongoDB by matching its title.
 
@@ -314,10 +549,11 @@ def delete_todo_by_title(title: str) -> dict:
         }
     """
     try:
-        db = client["todo_agent"]
-        collection = db["agent"]
+        collection = await get_collection()
 
-        result = collection.delete_one({"title": title})
+        result = await collection.delete_one({"title": title})
+        read_cache.invalidate_titles(title)
+        read_cache.invalidate_pages()
 
         if result.deleted_count == 0:
             return {"success": False, "message": f"No To-Do found with title '{title}'."}
@@ -327,6 +563,137 @@ def delete_todo_by_title(title: str) -> dict:
         return {"success": False, "message": f"Error: {str(e)}"}
 
 
+# ------------------------------
+# Tool Function for many To-Dos at once
+# ------------------------------
+@function_tool
+async def bulk_todos(operations: list[BulkTodoOperation]) -> dict:
+    """
+    Insert, update and delete many To-Do items in a single database call.
+
+    Use this instead of calling create_todo / update_todo_by_title /
+    delete_todo_by_title once per task whenever the user asks for several changes.
+
+    Args:
+        operations (list[BulkTodoOperation]): The operations to run. They are
+            independent: one failing does not stop the others. A title may
+            only appear in one operation (as its title or new title), send
+            several changes to the same To-Do as separate calls.
+
+    Returns:
+        dict: {
+            "results": list[dict],  # one per operation, in the same order:
+                                    # {"index", "action", "title", "success", "message", "id"?}
+            "inserted": int,        # number of To-Dos created
+            "matched": int,         # number of To-Dos found by the updates
+            "modified": int,        # number of To-Dos actually changed
+            "deleted": int          # number of To-Dos deleted
+        }
+    """
+    results: list[dict] = []
+    # operations that go to the server, as (position in `operations`, request)
+    pending: list[tuple[int, Any]] = []
+
+    # the server doesn't run an unordered batch in order, so two operations on
+    # the same title could not be told apart in its counts: refuse them instead
+    uses: dict[str, int] = {}
+    for op in operations:
+        for title in {op.title, op.new_title if op.action == "update" else None}:
+            if title:
+                uses[title] = uses.get(title, 0) + 1
+
+    for index, op in enumerate(operations):
+        outcome = {"index": index, "action": op.action, "title": op.title, "success": True, "message": "Done."}
+        shared = [title for title in (op.title, op.new_title if op.action == "update" else None) if title and uses[title] > 1]
+        if shared:
+            results.append({
+                **outcome,
+                "success": False,
+                "message": f"Another operation in this call also uses the title '{shared[0]}', send them separately.",
+            })
+            continue
+        if op.action == "insert":
+            # the id is chosen here so it can be reported back per operation
+            new_id = ObjectId()
+            pending.append((index, InsertOne({"_id": new_id, "title": op.title, "description": op.description or ""})))
+            outcome["id"] = str(new_id)
+        elif op.action == "update":
+            update_fields = {}
+            if op.new_title:
+                update_fields["title"] = op.new_title
+            if op.new_description:
+                update_fields["description"] = op.new_description
+            if not update_fields:
+                results.append({**outcome, "success": False, "message": "No fields provided to update."})
+                continue
+            pending.append((index, UpdateOne({"title": op.title}, {"$set": update_fields})))
+        else:
+            pending.append((index, DeleteOne({"title": op.title})))
+        results.append(outcome)
+
+    summary = {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0}
+    if not pending:
+        return {"results": results, **summary}
+
+    try:
+        collection = await get_collection()
+        # bulk_write only counts matches for the whole batch, so look up which
+        # titles exist (one query) to tell which updates and deletes find nothing;
+        # every title is in one operation only, so the batch can't change the answer
+        lookup = [operations[index].title for index, request in pending if not isinstance(request, InsertOne)]
+        existing: set[str] = set()
+        if lookup:
+            async for doc in collection.find({"title": {"$in": lookup}}, {"title": 1}):
+                existing.add(doc["title"])
+
+        requests = []
+        # position in `requests` -> position in `operations`
+        request_ops: list[int] = []
+        for index, request in pending:
+            title = operations[index].title
+            if not isinstance(request, InsertOne) and title not in existing:
+                results[index].update(success=False, message=f"No To-Do found with title '{title}'.")
+                continue
+            requests.append(request)
+            request_ops.append(index)
+        if not requests:
+            return {"results": results, **summary}
+
+        # unordered: the server runs them in one round trip and keeps going past failures
+        result = await collection.bulk_write(requests, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+    except Exception as e:
+        invalidate_bulk(operations)
+        for index, _ in pending:
+            if results[index]["success"]:
+                results[index].update(success=False, message=f"Error: {e}")
+                results[index].pop("id", None)
+        return {"results": results, **summary}
+
+    invalidate_bulk(operations)
+    for error in details.get("writeErrors", []):
+        outcome = results[request_ops[error["index"]]]
+        outcome.update(success=False, message=f"Error: {error.get('errmsg', 'write failed')}")
+        outcome.pop("id", None)
+
+    return {
+        "results": results,
+        "inserted": details.get("nInserted", 0),
+        "matched": details.get("nMatched", 0),
+        "modified": details.get("nModified", 0),
+        "deleted": details.get("nRemoved", 0),
+    }
+
+
+def invalidate_bulk(operations: list[BulkTodoOperation]) -> None:
+    """Drop every cached entry a bulk request may have changed."""
+    for op in operations:
+        read_cache.invalidate_titles(op.title, op.new_title)
+    read_cache.invalidate_pages()
+
+
 # ------------------------------
 # Create the To-Do Agent
 # ------------------------------
@@ -335,21 +702,30 @@ agent = Agent(
     instructions=(
         "You are a smart To-Do assistant. "
         "You can create, update, list, and delete tasks in a MongoDB database. "
-        "Always store and retrieve tasks efficiently, and respond clearly to the user."
+        "Always store and retrieve tasks efficiently, and respond clearly to the user. "
+        "For several changes at once use bulk_todos in a single call. "
+        "fetch_todos returns one page at a time, only fetch the next page (after=next_cursor) when you need it."
     ),
     model=llm_model,
-    tools=[create_todo , delete_todo_by_title, update_todo_by_title, fetch_todo_by_title , fetch_todos]   
+    tools=[create_todo , delete_todo_by_title, update_todo_by_title, fetch_todo_by_title , fetch_todos , bulk_todos]   
 )
 
 # ------------------------------
 # Run & Test the Agent
 # ------------------------------
-
-query = input("enter you query")
-result = Runner.run_sync(
-    agent,
-    query,
-      
-)
-print("=== Agent Output ===")
-print(result.final_output)
+async def main():
+    # no ping here: the database is only contacted when a tool needs it,
+    # call health_check() where waiting on it is acceptable
+    query = input("enter you query")
+    result = await Runner.run(
+        agent,
+        query,
+    )
+    print("=== Agent Output ===")
+    print(result.final_output)
+    print(f"Read cache: {read_cache.stats()}")
+    await mongo.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,24 +1,13 @@
-from agents import Agent ,Runner , AsyncOpenAI, OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,  function_tool
+from agents import Agent ,Runner , OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,  function_tool
+from agent_common import get_model
 from pydantic import BaseModel
 from dotenv import load_dotenv
-import os
 
 
 load_dotenv()
 
-# Load Gemini API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-externel_client : AsyncOpenAI= AsyncOpenAI(
-     api_key= GOOGLE_API_KEY,
-     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-) 
-
-
-llm_model : OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-       model="gemini-2.5-flash",
-      openai_client= externel_client
-)
+llm_model : OpenAIChatCompletionsModel = get_model("gemini-2.5-flash")
 
 @function_tool
 def fetch_weather(location: str)-> str:
@@ -0,0 +1,197 @@
+"""
+Tests for the To-Do tools of 06c_mongodb_tool.py, without an LLM.
+
+The tools are called the way the agent runner calls them, through
+``FunctionTool.on_invoke_tool`` with JSON arguments, against a real mongod
+(MONGO_URL, default mongodb://localhost:27017). They work on their own
+database, todo_agent_test, which is dropped afterwards. Without a reachable
+mongod every test is skipped.
+
+    python -m unittest test_06c_mongodb_tool.py
+"""
+import dataclasses
+import importlib.util
+import json
+import os
+import unittest
+from pathlib import Path
+from typing import Any
+
+from pymongo import MongoClient
+
+# never the real database, whatever .env says
+os.environ["MONGO_DB"] = "todo_agent_test"
+# the agent is built on import, its model is never called here
+os.environ.setdefault("GOOGLE_API_KEY", "unused")
+
+MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+TOOLS_PATH = Path(__file__).resolve().parent / "06c_mongodb_tool.py"
+
+tools: Any = None
+
+
+def setUpModule():
+    global tools
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        raise unittest.SkipTest(f"no mongod at {MONGO_URL}: {e}")
+    finally:
+        client.close()
+
+    # the script name starts with a digit, so it is loaded by path
+    spec = importlib.util.spec_from_file_location("mongodb_tool", TOOLS_PATH)
+    tools = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tools)
+
+
+def tearDownModule():
+    if tools is None:
+        return
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.drop_database(tools.MONGO_DB)
+    finally:
+        client.close()
+
+
+async def call(tool, **arguments: Any) -> Any:
+    """Call a FunctionTool the way the runner does: a tool context and JSON arguments."""
+    from agents.tool_context import ToolContext
+
+    raw = json.dumps(arguments)
+    kwargs = {"context": None, "tool_name": tool.name, "tool_call_id": "test"}
+    # newer SDK versions also want the raw arguments on the context
+    if "tool_arguments" in {field.name for field in dataclasses.fields(ToolContext)}:
+        kwargs["tool_arguments"] = raw
+    return await tool.on_invoke_tool(ToolContext(**kwargs), raw)
+
+
+class MongoTodoToolsTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        # every test starts from an empty collection and a cold cache
+        await tools.mongo.get()[tools.MONGO_DB].drop_collection(tools.MONGO_COLLECTION)
+        tools._indexes_ready = False
+        tools.read_cache = tools.TodoReadCache()
+
+    async def asyncTearDown(self):
+        # the client belongs to this test's event loop
+        await tools.mongo.close()
+
+    async def create(self, title: str, description: str = "") -> dict:
+        todo = await call(tools.create_todo, data={"title": title, "description": description})
+        self.assertIsInstance(todo, dict, todo)
+        return todo
+
+    async def test_create_and_fetch_by_title(self):
+        created = await self.create("Buy milk", "2 litres")
+        self.assertEqual(created["title"], "Buy milk")
+        self.assertEqual(created["description"], "2 litres")
+
+        fetched = await call(tools.fetch_todo_by_title, title="Buy milk")
+        self.assertEqual(fetched, created)
+        # second read comes from the cache and is the same
+        self.assertEqual(await call(tools.fetch_todo_by_title, title="Buy milk"), created)
+
+        missing = await call(tools.fetch_todo_by_title, title="Buy bread")
+        self.assertEqual(missing, "No todo found with title: Buy bread")
+
+    async def test_create_duplicate_title(self):
+        await self.create("Buy milk")
+        duplicate = await call(tools.create_todo, data={"title": "Buy milk", "description": "again"})
+        self.assertIsInstance(duplicate, str)
+        self.assertIn("already exists", duplicate)
+
+    async def test_fetch_todos_pages_and_search(self):
+        created = [await self.create(title, f"errand {i}") for i, title in enumerate(["Buy milk", "Call mom", "Pay rent"])]
+
+        first = await call(tools.fetch_todos, limit=2)
+        self.assertEqual([todo["id"] for todo in first["todos"]], [todo["id"] for todo in created[:2]])
+        self.assertEqual(first["next_cursor"], created[1]["id"])
+
+        second = await call(tools.fetch_todos, after=first["next_cursor"], limit=2)
+        self.assertEqual(second["todos"], [created[2]])
+        self.assertIsNone(second["next_cursor"])
+
+        found = await call(tools.fetch_todos, search="rent")
+        self.assertEqual([todo["title"] for todo in found["todos"]], ["Pay rent"])
+
+    async def test_update_todo_by_title(self):
+        created = await self.create("Buy milk", "2 litres")
+        # warm the caches the update has to invalidate
+        await call(tools.fetch_todo_by_title, title="Buy milk")
+        await call(tools.fetch_todos)
+
+        result = await call(tools.update_todo_by_title, title="Buy milk", new_title="Buy oat milk", new_description="1 litre")
+        self.assertTrue(result["success"], result)
+        self.assertEqual(result["updated_doc"], {"id": created["id"], "title": "Buy oat milk", "description": "1 litre"})
+
+        self.assertEqual(await call(tools.fetch_todo_by_title, title="Buy milk"), "No todo found with title: Buy milk")
+        self.assertEqual(await call(tools.fetch_todo_by_title, title="Buy oat milk"), result["updated_doc"])
+        self.assertEqual((await call(tools.fetch_todos))["todos"], [result["updated_doc"]])
+
+        missing = await call(tools.update_todo_by_title, title="Buy bread", new_description="white")
+        self.assertFalse(missing["success"])
+        self.assertIn("No To-Do found", missing["message"])
+
+        nothing = await call(tools.update_todo_by_title, title="Buy oat milk")
+        self.assertFalse(nothing["success"])
+        self.assertEqual(nothing["message"], "No fields provided to update.")
+
+    async def test_update_to_taken_title(self):
+        await self.create("Buy milk")
+        await self.create("Call mom")
+        result = await call(tools.update_todo_by_title, title="Buy milk", new_title="Call mom")
+        self.assertFalse(result["success"])
+        self.assertIn("already exists", result["message"])
+
+    async def test_delete_todo_by_title(self):
+        await self.create("Buy milk")
+        await call(tools.fetch_todo_by_title, title="Buy milk")
+
+        result = await call(tools.delete_todo_by_title, title="Buy milk")
+        self.assertEqual(result, {"success": True, "message": "To-Do deleted successfully."})
+        self.assertEqual(await call(tools.fetch_todo_by_title, title="Buy milk"), "No todo found with title: Buy milk")
+        self.assertEqual((await call(tools.fetch_todos))["todos"], [])
+
+        again = await call(tools.delete_todo_by_title, title="Buy milk")
+        self.assertFalse(again["success"])
+        self.assertIn("No To-Do found", again["message"])
+
+    async def test_bulk_reports_missing_titles(self):
+        await self.create("Buy milk")
+        await self.create("Call mom")
+
+        result = await call(tools.bulk_todos, operations=[
+            {"action": "insert", "title": "Pay rent", "description": "by Friday"},
+            {"action": "update", "title": "Buy milk", "new_description": "2 litres"},
+            {"action": "update", "title": "Buy bread", "new_description": "white"},
+            {"action": "delete", "title": "Call mom"},
+        ])
+        self.assertEqual([outcome["success"] for outcome in result["results"]], [True, True, False, True])
+        self.assertIn("No To-Do found", result["results"][2]["message"])
+        self.assertEqual((result["inserted"], result["matched"], result["deleted"]), (1, 1, 1))
+
+        titles = [todo["title"] for todo in (await call(tools.fetch_todos))["todos"]]
+        self.assertEqual(titles, ["Buy milk", "Pay rent"])
+
+    async def test_bulk_refuses_operations_on_the_same_title(self):
+        await self.create("Buy milk")
+        await self.create("Call mom")
+
+        result = await call(tools.bulk_todos, operations=[
+            {"action": "update", "title": "Buy milk", "new_title": "Buy oat milk"},
+            {"action": "delete", "title": "Buy milk"},
+            {"action": "update", "title": "Call mom", "new_title": "Pay rent"},
+            {"action": "insert", "title": "Pay rent", "description": "by Friday"},
+        ])
+        self.assertEqual([outcome["success"] for outcome in result["results"]], [False, False, False, False])
+        self.assertIn("send them separately", result["results"][0]["message"])
+
+        titles = [todo["title"] for todo in (await call(tools.fetch_todos))["todos"]]
+        self.assertEqual(titles, ["Buy milk", "Call mom"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,79 +1,100 @@
-from agents import Agent ,Runner , AsyncOpenAI, OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,  function_tool
+from agents import Agent ,Runner , OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,  function_tool
+from agent_common import get_model
 from pydantic import BaseModel 
 from dotenv import load_dotenv
-import os
 from typing import Dict , Any
 from datetime import datetime
-import json
+from todo_store import open_store
 load_dotenv()
 
+# the todos are kept in ./todo.log by default, set TODO_BACKEND=sqlite to use ./todo.db
 
-# Load Gemini API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-externel_client : AsyncOpenAI= AsyncOpenAI(
-     api_key= GOOGLE_API_KEY,
-     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-) 
+# Gemini model from the shared, pooled provider
+llm_model : OpenAIChatCompletionsModel = get_model("gemini-2.5-flash")
 
 
-llm_model : OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-       model="gemini-2.5-flash",
-      openai_client= externel_client
-)
 
+# the most todos list_todos hands to the model in one call
+MAX_PAGE_SIZE = 100
 
 
 @function_tool
-def list_todos() -> str:
+def list_todos(
+    offset: int = 0,
+    limit: int = 20,
+    completed: bool | None = None,
+    priority: str | None = None,
+    fields: list[str] | None = None,
+) -> Dict[str, Any]:
     """
-    Return the list of todos from a JSON file.
+    Return one page of todos, optionally only the ones with the given
+    completed state and/or priority (e.g. completed=False, priority="high"
+    for the pending high priority todos).
+
+    Args:
+        offset: how many matching todos to skip
+        limit: page size, at most 100
+        completed: only todos with this completed state
+        priority: only todos with this priority
+        fields: only return these fields of each todo (e.g. ["task"]), the id is always included
+
+    Returns a dict with "total", "items" and "next_offset", call again with
+    offset=next_offset to get the next page (it is null on the last page).
     """
     try:
         print("Listing todos...")
-        with open("./todo.json", "r") as f:
-            data = json.load(f)   # <-- load JSON from file
-        return data
-    except FileNotFoundError:
-        raise FileNotFoundError("The file todo.json was not found.")
+        # cached per process, only a stat() of the log unless it changed on disk
+        store = open_store()
+        return store.page(
+            offset=offset,
+            limit=min(max(limit, 1), MAX_PAGE_SIZE),
+            completed=completed,
+            priority=priority,
+            fields=fields,
+        )
     except Exception as e:
         raise RuntimeError(f"Error reading todos: {e}")
+
+
+@function_tool
+def search_todos(query: str, limit: int = 5) -> list[Dict[str, Any]]:
+    """
+    Find todos by words in their task, best matches first.
+    Use this to find a todo (e.g. to get its id) instead of listing all todos.
+
+    Args:
+        query: words to look for, e.g. "dentist appointment"
+        limit: how many todos to return, at most 20
+    """
+    try:
+        print("Searching todos...")
+        store = open_store()
+        return store.search(query, limit=min(max(limit, 1), 20))
+    except Exception as e:
+        raise RuntimeError(f"Error searching todos: {e}")
     
 
 @function_tool
-def add_todo(task: str = "", completed: bool = False, priority: str = "") -> Dict[str, Any]:
+async def add_todo(task: str = "", completed: bool = False, priority: str = "") -> Dict[str, Any]:
     """
-    Add a todo to the todos.json file
+    Add a todo to the todo store
     """
     try:
         print("Adding a todo...")
-        # Read existing todos
-        try:
-            with open('./todo.json', "r") as file:
-                todos = json.load(file)
-        except FileNotFoundError:
-            # if file not found start from empty todos
-            todos = []
-        except json.JSONDecodeError:
-            raise ValueError("Error decoding todo.json")
-
+        store = open_store()
         # Create new todo
         new_todo = {
-            "id": len(todos) + 1,
             "task": task,
             "completed": completed,
             "priority": priority,
             "due_date": datetime.now().isoformat()
         }
 
-        # Append to the todos
-        todos.append(new_todo)
-
-        # Save back to file
-        with open('./todo.json', "w") as file:
-            json.dump(todos, file, indent=2)
-
-        return new_todo
+        # the store gives it the next id from its counter and appends it to the log,
+        # awaiting returns once the write is on disk
+        [todo] = await store.apply_async([{"op": "add", "todo": new_todo}])
+        return todo
 
     except Exception as e:
         raise Exception(f"Failed to add todo: {e}")
@@ -81,37 +102,18 @@ def add_todo(task: str = "", completed: bool = False, priority: str = "") -> Dic
 
 
 @function_tool
-def delete_todo(id: str) -> str:
+async def delete_todo(id: str) -> str:
     """
-    Delete a todo by its id from todo.json.
+    Delete a todo by its id.
     """
     try:
         print("Deleting todo...")
+        store = open_store()
 
-        # Step 1: Read existing todos from the JSON file
-        try:
-            with open('./todo.json', "r") as file:
-                todos = json.load(file)  # load the list of todos
-        except FileNotFoundError:
-            return "No todos found. The file does not exist."
-        except json.JSONDecodeError:
-            raise ValueError("Error decoding todo.json. The file may be corrupted.")
-
-        # Step 2: Find and remove the todo with matching id
-        todo_found = False
-        for todo in todos:
-            if str(todo["id"]) == str(id):  # compare IDs as strings
-                todos.remove(todo)
-                todo_found = True
-                break  # stop loop after removing
-
-        if not todo_found:
+        [deleted] = await store.apply_async([{"op": "delete", "id": int(id)}])
+        if not deleted:
             return f"Todo with id {id} not found."
 
-        # Step 3: Save updated list back to JSON file
-        with open('./todo.json', "w") as file:
-            json.dump(todos, file, indent=2)
-
         return f"Todo with id {id} deleted successfully."
 
     except Exception as e:
@@ -126,75 +128,159 @@ class TodoUpdate(BaseModel):
     priority: str | None = None
 
 
+# Pydantic model for one item of a bulk update
+class TodoItemUpdate(TodoUpdate):
+    id: str
+
+
+# Pydantic model for one item of a bulk add
+class NewTodo(BaseModel):
+    task: str
+    completed: bool = False
+    priority: str = ""
+
+
+def todo_changes(data: TodoUpdate) -> Dict[str, Any]:
+    """
+    Fields to change on a todo: only the ones that were given, plus a new due_date
+    """
+    changes: Dict[str, Any] = {}
+    if data.task is not None:
+        changes["task"] = data.task
+    if data.completed is not None:
+        changes["completed"] = data.completed
+    if data.priority is not None:
+        changes["priority"] = data.priority
+
+    changes["due_date"] = datetime.now().isoformat()
+    return changes
+
+
 # tool to update the todo
 @function_tool 
-def update_todo(id: str , data: TodoUpdate):
+async def update_todo(id: str , data: TodoUpdate):
     """
        get the todo by id and data and update
     """
     try:
         print("editing todos...")
-        try:
-            # read the file
-            with open('./todo.json' , "r") as file :
-                todos = json.load(file) 
-        except FileNotFoundError:
-            return "No file found . File does not exists"
-        except json.JSONDecodeError:
-            raise ValueError ("error in decoding json.todos")
-        
-        # find the todo and updata 
-        todo_found = False
-        for todo in todos:
-            if str(todo["id"]) == str(id):
-                    # todo["task"]= data.get("task" , todo["task"])
-                    # todo["completed"]= data.get("completed" , todo.get("completed" , False))
-                    # todo["priority"]= data.get("priority" , todo.get("priority" ,""))
-                    # todo["due_date"]= datetime.now().isoformat()
-                
-                if data.task is not None:
-                      todo["task"] = data.task
-                if data.completed is not None:
-                       todo["completed"] = data.completed
-                if data.priority is not None:
-                       todo["priority"] = data.priority
-
-                todo["due_date"] = datetime.now().isoformat()
-
-                todo_found = True
-                break # break if todo update
-             
-        if not todo_found :
+        store = open_store()
+        # look up the todo by id in the in-memory index and merge the changes
+        [todo] = await store.apply_async([{"op": "update", "id": int(id), "changes": todo_changes(data)}])
+        if todo is None:
              return f"no todo found with {id}"
-  
-        # Step 3: Save updated list back to JSON file
-        with open('./todo.json', "w") as file:
-            json.dump(todos, file, indent=2)
-        
+
         return f"todo with {id} updated successfully"
     
     except Exception as e:
         return f"Error updating todo: {e}"
-    
+
+
+# ------------------------------
+# bulk tools: many todos in one tool call and one write
+# ------------------------------
+@function_tool
+async def add_todos(items: list[NewTodo]) -> list[Dict[str, Any]]:
+    """
+    Add many todos at once. Use this instead of calling add_todo repeatedly.
+    Returns the created todos, in the same order as the items.
+    """
+    try:
+        print(f"Adding {len(items)} todos...")
+        store = open_store()
+        due_date = datetime.now().isoformat()
+        return await store.apply_async([
+            {"op": "add", "todo": {**item.model_dump(), "due_date": due_date}}
+            for item in items
+        ])
+    except Exception as e:
+        raise Exception(f"Failed to add todos: {e}")
+
+
+@function_tool
+async def update_todos(items: list[TodoItemUpdate]) -> list[Dict[str, Any]]:
+    """
+    Update many todos at once, each item has the id of the todo and the fields to change.
+    Returns one result per item: {"id", "success", "message"}.
+    """
+    print(f"editing {len(items)} todos...")
+    results: list[Dict[str, Any]] = [{"id": item.id} for item in items]
+    # a bad id only fails its own item, the others are still applied
+    operations, positions = [], []
+    for position, item in enumerate(items):
+        try:
+            operations.append({"op": "update", "id": int(item.id), "changes": todo_changes(item)})
+            positions.append(position)
+        except ValueError:
+            results[position].update(success=False, message=f"invalid todo id {item.id!r}")
+
+    try:
+        updated = await open_store().apply_async(operations) if operations else []
+        for position, todo in zip(positions, updated):
+            results[position].update(
+                success=todo is not None,
+                message="updated successfully" if todo is not None else f"no todo found with {items[position].id}",
+            )
+    except Exception as e:
+        for position in positions:
+            results[position].update(success=False, message=f"Error updating todo: {e}")
+    return results
+
+
+@function_tool
+async def delete_todos(ids: list[str]) -> list[Dict[str, Any]]:
+    """
+    Delete many todos at once by their ids.
+    Returns one result per id: {"id", "success", "message"}.
+    """
+    print(f"Deleting {len(ids)} todos...")
+    results: list[Dict[str, Any]] = [{"id": id} for id in ids]
+    # a bad id only fails its own item, the others are still deleted
+    operations, positions = [], []
+    for position, id in enumerate(ids):
+        try:
+            operations.append({"op": "delete", "id": int(id)})
+            positions.append(position)
+        except ValueError:
+            results[position].update(success=False, message=f"invalid todo id {id!r}")
+
+    try:
+        deleted = await open_store().apply_async(operations) if operations else []
+        for position, ok in zip(positions, deleted):
+            results[position].update(
+                success=ok,
+                message="deleted successfully" if ok else f"Todo with id {ids[position]} not found.",
+            )
+    except Exception as e:
+        for position in positions:
+            results[position].update(success=False, message=f"Error deleting todo: {e}")
+    return results
+
 
 
 
 agent = Agent(
      name ="Todo Assistant",
-    instructions = "you are todo helpful assistant , you can add , get , updata and delete todos",
+    instructions = (
+        "you are todo helpful assistant , you can add , get , updata and delete todos. "
+        "When the user asks for several todos at once use add_todos , update_todos or delete_todos "
+        "in a single call instead of one call per todo. "
+        "To find a todo by what it is about use search_todos instead of listing every todo"
+    ),
     model= llm_model,
-    tools= [list_todos , add_todo , delete_todo , update_todo]
+    tools= [list_todos , search_todos , add_todo , delete_todo , update_todo , add_todos , update_todos , delete_todos]
 )
 
 
-query = input ("enter your query")
+if __name__ == "__main__":
+    query = input ("enter your query")
 
-result = Runner.run_sync(
-    agent,
-    input=query,
-   )
+    result = Runner.run_sync(
+        agent,
+        input=query,
+       )
 
 
-print(result.final_output)
+    print(result.final_output)
 
 
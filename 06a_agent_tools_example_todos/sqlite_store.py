@@ -0,0 +1,291 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Dict, Any, List, Tuple
+
+from todo_search import tokenize
+from todo_store import TodoBackend, LEGACY_JSON_PATH, SQLITE_PATH
+
+
+# ------------------------------
+# SQLite todo storage
+# ------------------------------
+# Selected with TODO_BACKEND=sqlite. The database runs in WAL mode so readers
+# never block the writer and several processes can share one file. Every
+# thread gets its own connection; sqlite3 keeps the compiled form of each SQL
+# string below in a per-connection statement cache, so they are prepared once
+# and then only re-bound.
+#
+# ``search`` uses an FTS5 table over the task text. Triggers keep it in sync
+# with every insert, update and delete, including writes from other processes.
+
+COLUMNS = ("id", "task", "completed", "priority", "due_date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    task      TEXT    NOT NULL DEFAULT '',
+    completed INTEGER NOT NULL DEFAULT 0,
+    priority  TEXT    NOT NULL DEFAULT '' COLLATE NOCASE,
+    due_date  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_todos_completed ON todos (completed);
+CREATE INDEX IF NOT EXISTS idx_todos_priority ON todos (priority);
+CREATE INDEX IF NOT EXISTS idx_todos_completed_priority ON todos (completed, priority);
+CREATE INDEX IF NOT EXISTS idx_todos_due_date ON todos (due_date);
+"""
+
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5 (task, content='todos', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+    INSERT INTO todos_fts (rowid, task) VALUES (new.id, new.task);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+    INSERT INTO todos_fts (todos_fts, rowid, task) VALUES ('delete', old.id, old.task);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF task ON todos BEGIN
+    INSERT INTO todos_fts (todos_fts, rowid, task) VALUES ('delete', old.id, old.task);
+    INSERT INTO todos_fts (rowid, task) VALUES (new.id, new.task);
+END;
+"""
+
+INSERT_TODO = "INSERT INTO todos (task, completed, priority, due_date) VALUES (?, ?, ?, ?)"
+# not INSERT OR REPLACE: its implicit delete doesn't fire todos_fts_delete, which would leave stale search text
+UPSERT_TODO_WITH_ID = """
+INSERT INTO todos (id, task, completed, priority, due_date) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    task = excluded.task, completed = excluded.completed, priority = excluded.priority, due_date = excluded.due_date
+"""
+SELECT_TODO = "SELECT id, task, completed, priority, due_date FROM todos WHERE id = ?"
+UPDATE_TODO = "UPDATE todos SET task = ?, completed = ?, priority = ?, due_date = ? WHERE id = ?"
+DELETE_TODO = "DELETE FROM todos WHERE id = ?"
+COUNT_TODOS = "SELECT COUNT(*) FROM todos"
+SEARCH_TODOS = """
+SELECT t.id, t.task, t.completed, t.priority, t.due_date, -bm25(todos_fts) AS score
+FROM todos_fts JOIN todos t ON t.id = todos_fts.rowid
+WHERE todos_fts MATCH ?
+ORDER BY bm25(todos_fts)
+LIMIT ?
+"""
+
+
+class SqliteTodoStore(TodoBackend):
+    """
+    Todos in a SQLite table, with indexes on completed, priority and due_date.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH, legacy_path: str = LEGACY_JSON_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        has_search = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'todos_fts'"
+        ).fetchone()
+        conn.executescript(SEARCH_SCHEMA)
+        if not has_search:
+            # databases created before search existed: index the rows once
+            conn.execute("INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')")
+        if os.path.exists(legacy_path) and conn.execute(COUNT_TODOS).fetchone()[0] == 0:
+            migrate_json(legacy_path, self)
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=64)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    # ------------------------------
+    # reads
+    # ------------------------------
+    def get(self, todo_id: int) -> Dict[str, Any] | None:
+        row = self._conn().execute(SELECT_TODO, (int(todo_id),)).fetchone()
+        return _row_to_todo(row) if row is not None else None
+
+    def find(self, completed: bool | None = None, priority: str | None = None) -> List[Dict[str, Any]]:
+        where, params = _where(completed, priority)
+        rows = self._conn().execute(
+            f"SELECT id, task, completed, priority, due_date FROM todos{where} ORDER BY id", params
+        )
+        return [_row_to_todo(row) for row in rows]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        completed: bool | None = None,
+        priority: str | None = None,
+        fields: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        offset = max(offset, 0)
+        # only known column names ever reach the SQL text
+        columns = [c for c in COLUMNS if not fields or c == "id" or c in fields]
+        where, params = _where(completed, priority)
+
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM todos{where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM todos{where} ORDER BY id LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        )
+        items = [_row_to_todo(row) for row in rows]
+
+        next_offset = offset + len(items)
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset if next_offset < total else None,
+            "items": items,
+        }
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # quoted tokens joined with OR, so user text never hits FTS5 query syntax
+        match = " OR ".join(f'"{token}"' for token in tokens)
+        rows = self._conn().execute(SEARCH_TODOS, (match, limit))
+        return [{**_row_to_todo(row), "score": round(row["score"], 4)} for row in rows]
+
+    # ------------------------------
+    # writes
+    # ------------------------------
+    def apply(self, operations: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Apply the operations in one transaction, see ``TodoStore.apply``.
+        """
+        for operation in operations:
+            if operation["op"] not in ("add", "update", "delete"):
+                raise ValueError(f"Unknown todo operation: {operation['op']}")
+
+        conn = self._conn()
+        results: List[Any] = []
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on busy_timeout instead of failing halfway through
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for operation in operations:
+                op = operation["op"]
+                if op == "add":
+                    todo = _todo_values(operation["todo"])
+                    cursor = conn.execute(INSERT_TODO, todo)
+                    results.append(dict(zip(COLUMNS, (cursor.lastrowid, *todo)), completed=bool(todo[1])))
+                elif op == "update":
+                    row = conn.execute(SELECT_TODO, (int(operation["id"]),)).fetchone()
+                    if row is None:
+                        results.append(None)
+                        continue
+                    todo = {**_row_to_todo(row), **operation["changes"], "id": row["id"]}
+                    conn.execute(UPDATE_TODO, (*_todo_values(todo), row["id"]))
+                    results.append(todo)
+                else:
+                    cursor = conn.execute(DELETE_TODO, (int(operation["id"]),))
+                    results.append(cursor.rowcount > 0)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+# ------------------------------
+# helpers
+# ------------------------------
+def _where(completed: bool | None, priority: str | None) -> Tuple[str, Tuple[Any, ...]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if completed is not None:
+        clauses.append("completed = ?")
+        params.append(int(bool(completed)))
+    if priority is not None:
+        clauses.append("priority = ?")
+        params.append(priority.strip())
+    if not clauses:
+        return "", ()
+    return " WHERE " + " AND ".join(clauses), tuple(params)
+
+
+def _todo_values(todo: Dict[str, Any]) -> Tuple[Any, ...]:
+    """task, completed, priority, due_date of a todo dict, in column order."""
+    return (
+        todo.get("task") or "",
+        int(bool(todo.get("completed"))),
+        (todo.get("priority") or "").strip(),
+        todo.get("due_date"),
+    )
+
+
+def _row_to_todo(row: sqlite3.Row) -> Dict[str, Any]:
+    todo = dict(row)
+    if "completed" in todo:
+        todo["completed"] = bool(todo["completed"])
+    return todo
+
+
+# ------------------------------
+# migration from todo.json
+# ------------------------------
+def migrate_json(json_path: str, store: SqliteTodoStore) -> int:
+    """
+    Copy the todos of an old ``todo.json`` into the database, keeping their ids.
+
+    Existing rows with the same id are replaced, so running it twice is safe.
+    A todo whose id already came up earlier in the file gets the next free id
+    instead (so a second run adds it again). Returns the number of todos copied.
+    """
+    try:
+        with open(json_path, "r", encoding="utf-8") as file:
+            todos = json.load(file)
+    except json.JSONDecodeError:
+        raise ValueError(f"Error decoding {json_path}")
+
+    conn = store._conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        (max_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM todos").fetchone()
+        next_id = max([max_id + 1, *(int(todo["id"]) + 1 for todo in todos)])
+        rows, seen = [], set()
+        for todo in todos:
+            todo_id = int(todo["id"])
+            if todo_id in seen:
+                print(f"Copied todo {todo_id} from {json_path} as {next_id}: its id was already taken")
+                todo_id, next_id = next_id, next_id + 1
+            seen.add(todo_id)
+            rows.append((todo_id, *_todo_values(todo)))
+        conn.executemany(UPSERT_TODO_WITH_ID, rows)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return len(todos)
+
+
+if __name__ == "__main__":
+    # python sqlite_store.py [todo.json] [todo.db]
+    json_path = sys.argv[1] if len(sys.argv) > 1 else LEGACY_JSON_PATH
+    db_path = sys.argv[2] if len(sys.argv) > 2 else SQLITE_PATH
+    store = SqliteTodoStore(db_path, legacy_path="")
+    print(f"Migrated {migrate_json(json_path, store)} todos from {json_path} to {db_path}")
+    store.close()
@@ -0,0 +1,44 @@
+"""
+Tests for the SQLite store and the todo.json migration of sqlite_store.py.
+
+    python -m unittest test_sqlite_store.py
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from sqlite_store import SqliteTodoStore, migrate_json
+
+
+class SqliteTodoStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.dir.name, "todo.json")
+        with open(self.json_path, "w", encoding="utf-8") as file:
+            json.dump([{"id": 1, "task": "buy milk"}, {"id": 2, "task": "call mom"}, {"id": 2, "task": "pay rent"}], file)
+        self.store = SqliteTodoStore(os.path.join(self.dir.name, "todo.db"), os.path.join(self.dir.name, "none.json"))
+
+    def tearDown(self):
+        self.store.close()
+        self.dir.cleanup()
+
+    def test_migrate_keeps_duplicate_ids(self):
+        self.assertEqual(migrate_json(self.json_path, self.store), 3)
+        self.assertEqual([(todo["id"], todo["task"]) for todo in self.store.find()], [(1, "buy milk"), (2, "call mom"), (3, "pay rent")])
+
+    def test_migrate_again_keeps_search_in_sync(self):
+        migrate_json(self.json_path, self.store)
+        self.store.update(1, {"task": "walk dog"})
+        # replaces todo 1 with the task from the file again
+        migrate_json(self.json_path, self.store)
+
+        self.assertEqual(self.store.search("dog"), [])
+        self.assertEqual([todo["id"] for todo in self.store.search("milk")], [1])
+        conn = self.store._conn()
+        conn.execute("INSERT INTO todos_fts (todos_fts) VALUES ('integrity-check')")
+
+
+if __name__ == "__main__":
+    unittest.main()
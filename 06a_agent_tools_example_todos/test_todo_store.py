@@ -0,0 +1,163 @@
+"""
+Tests for the append-only log store of todo_store.py.
+
+    python -m unittest test_todo_store.py
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import todo_store
+from todo_store import SortedIds, TodoStore
+
+
+class SortedIdsTest(unittest.TestCase):
+
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(7)
+        ids, expected = SortedIds(), set()
+        # small chunks so splits and empty chunks happen
+        with mock.patch.object(todo_store, "SORTED_CHUNK_SIZE", 4):
+            for _ in range(3000):
+                todo_id = rng.randrange(500)
+                if rng.random() < 0.6:
+                    if todo_id not in expected:
+                        ids.add(todo_id)
+                        expected.add(todo_id)
+                else:
+                    ids.discard(todo_id)
+                    expected.discard(todo_id)
+        ordered = sorted(expected)
+        self.assertEqual(list(ids), ordered)
+        self.assertEqual(len(ids), len(ordered))
+        for offset, limit in [(0, 5), (3, 10), (len(ordered) - 2, 10), (len(ordered), 5), (7, 0)]:
+            self.assertEqual(ids.slice(offset, limit), ordered[offset:offset + limit])
+
+
+class TodoStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "todo.log")
+        self.legacy_path = os.path.join(self.dir.name, "todo.json")
+        self.stores: list[TodoStore] = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self.dir.cleanup()
+
+    def open(self) -> TodoStore:
+        store = TodoStore(self.path, self.legacy_path, commit_interval=0)
+        self.stores.append(store)
+        return store
+
+    def reopen(self, store: TodoStore) -> TodoStore:
+        store.close()
+        self.stores.remove(store)
+        return self.open()
+
+    def tasks(self, store: TodoStore) -> list[str]:
+        return [todo["task"] for todo in store.find()]
+
+    def test_writes_survive_reopen(self):
+        store = self.open()
+        a = store.add({"task": "a", "completed": False, "priority": "high"})
+        b = store.add({"task": "b", "completed": False, "priority": "low"})
+        store.update(a["id"], {"completed": True})
+        store.delete(b["id"])
+
+        store = self.reopen(store)
+        self.assertEqual(store.find(), [{"id": 1, "task": "a", "completed": True, "priority": "high"}])
+        # ids of deleted todos are never handed out again
+        self.assertEqual(store.add({"task": "c"})["id"], 3)
+
+    def test_filtered_pages_follow_updates(self):
+        rng = random.Random(3)
+        store = self.open()
+        store.apply([
+            {"op": "add", "todo": {"task": f"task {i}", "completed": rng.random() < 0.5, "priority": rng.choice(["high", "Low", ""])}}
+            for i in range(300)
+        ])
+        store.apply([
+            {"op": "update", "id": rng.randrange(1, 301), "changes": {"completed": rng.random() < 0.5, "priority": rng.choice(["High", "low"])}}
+            for _ in range(100)
+        ] + [{"op": "delete", "id": rng.randrange(1, 301)} for _ in range(30)])
+
+        for completed, priority in [(True, None), (None, "HIGH"), (False, "low"), (None, None)]:
+            expected = [
+                todo["id"] for todo in store.all()
+                if (completed is None or todo["completed"] == completed)
+                and (priority is None or todo["priority"].lower() == priority.lower())
+            ]
+            self.assertEqual([todo["id"] for todo in store.find(completed, priority)], expected)
+            page = store.page(offset=10, limit=25, completed=completed, priority=priority, fields=["task"])
+            self.assertEqual(page["total"], len(expected))
+            self.assertEqual([todo["id"] for todo in page["items"]], expected[10:35])
+
+    def test_torn_last_line_is_cut_before_appending(self):
+        store = self.open()
+        store.add({"task": "a"})
+        store.add({"task": "b"})
+        store.close()
+        self.stores.remove(store)
+        # a crash in the middle of an append
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write('{"op":"put","todo":{"id":3,"ta')
+
+        store = self.open()
+        self.assertEqual(self.tasks(store), ["a", "b"])
+        self.assertEqual(store.add({"task": "c-after-restart"})["id"], 3)
+
+        store = self.reopen(store)
+        self.assertEqual(self.tasks(store), ["a", "b", "c-after-restart"])
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                json.loads(line)
+
+    def test_failed_write_is_refused_until_reload(self):
+        store = self.open()
+        store.add({"task": "a"})
+        with mock.patch.object(todo_store.os, "fsync", side_effect=OSError(28, "No space left on device")):
+            with self.assertRaises(OSError):
+                store.add({"task": "lost"})
+        with self.assertRaises(RuntimeError):
+            store.add({"task": "refused"})
+
+        self.assertTrue(store.reload())
+        self.assertEqual(self.tasks(store), ["a"])
+        self.assertEqual(store.search("lost"), [])
+        store.add({"task": "b"})
+
+        store = self.reopen(store)
+        self.assertEqual(self.tasks(store), ["a", "b"])
+
+    def test_compaction_keeps_live_todos(self):
+        store = self.open()
+        for i in range(50):
+            todo = store.add({"task": f"task {i}"})
+            store.update(todo["id"], {"completed": True})
+        for i in range(1, 51, 2):
+            store.delete(i)
+        store.compact()
+        store.add({"task": "after compaction"})
+
+        store = self.reopen(store)
+        self.assertEqual(len(store.find()), 26)
+        self.assertEqual(len(store.find(completed=True)), 25)
+        self.assertEqual(store.find()[-1]["id"], 51)
+
+    def test_legacy_import_keeps_duplicate_ids(self):
+        with open(self.legacy_path, "w", encoding="utf-8") as file:
+            json.dump([{"id": 1, "task": "a"}, {"id": 2, "task": "b"}, {"id": 2, "task": "c"}], file)
+
+        store = self.open()
+        self.assertEqual([(todo["id"], todo["task"]) for todo in store.find()], [(1, "a"), (2, "b"), (3, "c")])
+        self.assertEqual(store.add({"task": "d"})["id"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import heapq
+import math
+import re
+from typing import Dict, List, Tuple
+
+
+# ------------------------------
+# Inverted index over todo tasks
+# ------------------------------
+# token -> {todo id -> how often the token appears in that todo's task}
+#
+# Adding, changing or deleting a todo only touches the postings of the tokens
+# in its old and new text, so the index never has to be rebuilt. Results are
+# ranked with BM25, the usual full-text relevance score.
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# very common words that would match almost every todo
+STOP_WORDS = frozenset({"a", "an", "and", "the", "to", "of", "in", "on", "for", "at", "is", "my", "with"})
+
+# BM25 parameters: term frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of ``text`` without stop words."""
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class TodoSearchIndex:
+    """
+    Incrementally maintained inverted index with BM25 ranking.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_tokens: Dict[int, Dict[str, int]] = {}
+        self._doc_length: Dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def add(self, todo_id: int, text: str) -> None:
+        """Index ``text`` for a todo, replacing whatever was indexed for it before."""
+        self.remove(todo_id)
+        counts: Dict[str, int] = {}
+        tokens = tokenize(text)
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            self._postings.setdefault(token, {})[todo_id] = count
+        self._doc_tokens[todo_id] = counts
+        self._doc_length[todo_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, todo_id: int) -> None:
+        counts = self._doc_tokens.pop(todo_id, None)
+        if counts is None:
+            return
+        for token in counts:
+            postings = self._postings[token]
+            del postings[todo_id]
+            if not postings:
+                del self._postings[token]
+        self._total_length -= self._doc_length.pop(todo_id)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        Top ``limit`` (todo id, score) pairs for ``query``, best first.
+
+        Only the postings of the query tokens are visited.
+        """
+        docs = len(self._doc_tokens)
+        if docs == 0:
+            return []
+        avg_length = self._total_length / docs or 1.0
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for todo_id, tf in postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_length[todo_id] / avg_length)
+                scores[todo_id] = scores.get(todo_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
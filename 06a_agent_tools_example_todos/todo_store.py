@@ -0,0 +1,827 @@
+import asyncio
+import bisect
+import itertools
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+
+from todo_search import TodoSearchIndex
+
+
+# ------------------------------
+# Storage interface
+# ------------------------------
+class TodoBackend(ABC):
+    """
+    What the todo tools need from a storage backend.
+
+    Backends are picked with the TODO_BACKEND environment variable, see
+    ``open_store``: "log" (default, ``TodoStore`` below) or "sqlite"
+    (``SqliteTodoStore`` in sqlite_store.py).
+    """
+
+    @abstractmethod
+    def get(self, todo_id: int) -> Dict[str, Any] | None:
+        """The todo with that id, or None."""
+
+    @abstractmethod
+    def find(self, completed: bool | None = None, priority: str | None = None) -> List[Dict[str, Any]]:
+        """All todos matching the filters, in id order."""
+
+    @abstractmethod
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        completed: bool | None = None,
+        priority: str | None = None,
+        fields: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of the todos matching the filters, in id order, as
+        {"total", "offset", "limit", "next_offset", "items"}.
+        """
+
+    @abstractmethod
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        The ``limit`` todos whose task best matches ``query``, best first,
+        each with a relevance "score".
+        """
+
+    @abstractmethod
+    def apply(self, operations: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Apply add/update/delete operations atomically, one result per
+        operation (see ``TodoStore.apply`` for the format).
+        """
+
+    async def apply_async(self, operations: List[Dict[str, Any]]) -> List[Any]:
+        """Same as ``apply`` without blocking the event loop."""
+        return await asyncio.to_thread(self.apply, operations)
+
+    def add(self, todo: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a new todo under the next id."""
+        return self.apply([{"op": "add", "todo": todo}])[0]
+
+    def update(self, todo_id: int, changes: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Merge ``changes`` into a todo, returns None if there is no todo with that id."""
+        return self.apply([{"op": "update", "id": todo_id, "changes": changes}])[0]
+
+    def delete(self, todo_id: int) -> bool:
+        """Remove a todo, returns False if there was no todo with that id."""
+        return self.apply([{"op": "delete", "id": todo_id}])[0]
+
+    def reload(self) -> bool:
+        """Pick up changes made by other processes, True if anything was re-read."""
+        return False
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush pending writes and release the underlying files."""
+
+
+# ------------------------------
+# Log-structured todo storage
+# ------------------------------
+# Every mutation is appended to ``todo.log`` as one JSON line:
+#
+#   {"op": "put", "todo": {...}}   -> insert or replace a todo
+#   {"op": "del", "id": 3}         -> remove a todo
+#   {"op": "meta", "next_id": 8}   -> id counter, written at the top of a snapshot
+#   {"op": "batch", "records": [...]} -> several of the above, written in one go
+#
+# The current state lives in memory as an id -> todo dict, so reads never
+# touch the disk and a write costs one small append instead of a full rewrite.
+# Ids come from a monotonic counter that survives deletes and compaction, and
+# secondary indexes on ``completed``, ``priority`` and the pair of them
+# (SortedIds) answer filtered lookups by slicing out just the requested page. An inverted index over the task text (see
+# todo_search.py) is kept up to date the same way for ``search``.
+# When the log holds too many stale records it is compacted in a background
+# thread into a fresh snapshot (temp file + rename).
+#
+# All file writes go through one writer thread. Mutations from any thread or
+# coroutine are applied in memory under a lock and queued; every few
+# milliseconds the writer appends the whole queue with one write + fsync
+# (group commit) and then acknowledges each mutation, so callers only return
+# once their change is on disk.
+#
+# ``open_store`` keeps one store per log file for the whole process. Each call
+# costs a stat() of the log: the store remembers the (st_mtime_ns, st_size) left
+# by its own last write, and only reloads when some other process changed it.
+
+LOG_PATH = "./todo.log"
+LEGACY_JSON_PATH = "./todo.json"
+SQLITE_PATH = "./todo.db"
+
+# compact once the log has this many records and less than half of them are live
+COMPACT_MIN_RECORDS = 1000
+COMPACT_RATIO = 2.0
+
+# how long the writer waits for more mutations to join a group commit (seconds)
+COMMIT_INTERVAL = 0.002
+
+# ids per chunk of a SortedIds list, a chunk is split once it holds twice as many
+SORTED_CHUNK_SIZE = 1000
+
+
+class SortedIds:
+    """
+    Sorted list of todo ids, kept in chunks so that adding or removing one id
+    moves at most a chunk instead of the whole list.
+    """
+
+    def __init__(self):
+        self._chunks: List[List[int]] = []
+        self._maxes: List[int] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[int]:
+        return itertools.chain.from_iterable(self._chunks)
+
+    def add(self, todo_id: int) -> None:
+        if not self._chunks:
+            self._chunks.append([todo_id])
+            self._maxes.append(todo_id)
+            self._len = 1
+            return
+        i = bisect.bisect_left(self._maxes, todo_id)
+        if i == len(self._maxes):
+            # new todos have the highest id so far: a plain append to the last chunk
+            i -= 1
+            self._chunks[i].append(todo_id)
+            self._maxes[i] = todo_id
+        else:
+            bisect.insort(self._chunks[i], todo_id)
+        self._len += 1
+        chunk = self._chunks[i]
+        if len(chunk) >= 2 * SORTED_CHUNK_SIZE:
+            self._chunks[i:i + 1] = [chunk[:SORTED_CHUNK_SIZE], chunk[SORTED_CHUNK_SIZE:]]
+            self._maxes[i:i + 1] = [chunk[SORTED_CHUNK_SIZE - 1], chunk[-1]]
+
+    def discard(self, todo_id: int) -> None:
+        i = bisect.bisect_left(self._maxes, todo_id)
+        if i == len(self._maxes):
+            return
+        chunk = self._chunks[i]
+        j = bisect.bisect_left(chunk, todo_id)
+        if j == len(chunk) or chunk[j] != todo_id:
+            return
+        del chunk[j]
+        self._len -= 1
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def slice(self, offset: int, limit: int) -> List[int]:
+        """Up to ``limit`` ids starting at position ``offset``, skipping whole chunks to get there."""
+        ids: List[int] = []
+        for chunk in self._chunks:
+            if len(ids) >= limit:
+                break
+            if offset >= len(chunk):
+                offset -= len(chunk)
+                continue
+            ids.extend(chunk[offset:offset + limit - len(ids)])
+            offset = 0
+        return ids
+
+
+class TodoStore(TodoBackend):
+    """
+    Append-only log of todo mutations with an in-memory id -> todo index.
+    """
+
+    def __init__(
+        self,
+        path: str = LOG_PATH,
+        legacy_path: str = LEGACY_JSON_PATH,
+        commit_interval: float = COMMIT_INTERVAL,
+    ):
+        self.path = path
+        self.commit_interval = commit_interval
+        self._todos: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 1
+        # secondary indexes: value -> sorted ids of the todos holding that value
+        self._by_completed: Dict[bool, SortedIds] = {}
+        self._by_priority: Dict[str, SortedIds] = {}
+        self._by_both: Dict[Tuple[bool, str], SortedIds] = {}
+        self._search_index = TodoSearchIndex()
+        self._lock = threading.RLock()
+        self._records = 0          # records currently in the log file
+
+        # group commit queue: (sequence number, log line, ack future)
+        self._commit_cond = threading.Condition()
+        self._pending: List[Tuple[int, str, Future]] = []
+        self._seq = 0
+        self._inflight = 0         # queued or being written, not acked yet
+        self._closed = False
+        # set when a group commit fails, see _fail
+        self._failed: OSError | None = None
+        # (st_mtime_ns, st_size) of the log after our own last write
+        self._signature: Tuple[int, int] | None = None
+
+        # compaction state, see _start_compaction
+        self._compaction: Future | None = None
+        self._snapshot_seq = 0
+        self._compact_backlog: List[str] = []
+        self._compact_ready: Tuple[str, int] | None = None
+
+        if os.path.exists(self.path):
+            end = self._replay()
+            if end < os.path.getsize(self.path):
+                # cut the torn tail, or the next append would be glued onto it and lost on replay
+                print(f"Dropping a torn record at the end of {self.path}")
+                os.truncate(self.path, end)
+        elif os.path.exists(legacy_path):
+            self._import_legacy(legacy_path)
+
+        self._log = open(self.path, "a", encoding="utf-8")
+        self._signature = _signature(os.fstat(self._log.fileno()))
+        self._writer = threading.Thread(target=self._writer_loop, name="todo-log-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------
+    # loading
+    # ------------------------------
+    def _replay(self) -> int:
+        """
+        Rebuild the in-memory index by replaying the log from the start.
+        Returns the byte offset after the last complete record.
+        """
+        end = offset = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    # a torn last line from a crash mid-append, ignore it
+                    break
+                if not line.strip():
+                    end = offset
+                    continue
+                try:
+                    record = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                self._apply(record)
+                self._records += len(record.get("records", [record]))
+                end = offset
+        return end
+
+    def is_current(self) -> bool:
+        """True if the log on disk is the one this store last wrote or loaded."""
+        try:
+            return _signature(os.stat(self.path)) == self._signature
+        except FileNotFoundError:
+            return False
+
+    def reload(self) -> bool:
+        """
+        Re-read the log if another process changed it.
+
+        Skipped (returns False) while our own writes or a compaction are in
+        flight, since the file is expected to differ then. After a failed
+        write it always re-reads, to drop the changes that never reached the log.
+        """
+        with self._lock:
+            if self._inflight or self._compaction is not None:
+                return False
+            if self._failed is None and self.is_current():
+                return False
+            with self._commit_cond:
+                # nothing is queued and the writer is idle, so the handle can be swapped
+                self._log.close()
+                self._todos = {}
+                self._by_completed = {}
+                self._by_priority = {}
+                self._by_both = {}
+                self._search_index.clear()
+                self._records = 0
+                if os.path.exists(self.path):
+                    self._replay()
+                self._log = open(self.path, "a", encoding="utf-8")
+                self._signature = _signature(os.fstat(self._log.fileno()))
+                self._failed = None
+            return True
+
+    def _import_legacy(self, legacy_path: str) -> None:
+        """Import an old ``todo.json`` list and write it out as the first snapshot."""
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as file:
+                todos = json.load(file)
+        except json.JSONDecodeError:
+            raise ValueError(f"Error decoding {legacy_path}")
+
+        # an id that shows up twice would overwrite the earlier todo: number the later one anew
+        next_id = max([self._next_id, *(int(todo["id"]) + 1 for todo in todos)])
+        for todo in todos:
+            todo_id = int(todo["id"])
+            if todo_id in self._todos:
+                todo = {**todo, "id": next_id}
+                print(f"Imported todo {todo_id} from {legacy_path} as {next_id}: its id was already taken")
+                next_id += 1
+            self._apply({"op": "put", "todo": todo})
+        self._write_snapshot(self._snapshot_lines(), self.path)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        if record["op"] == "put":
+            todo = record["todo"]
+            todo_id = int(todo["id"])
+            old = self._todos.get(todo_id)
+            # the id lists only change when one of the filtered fields does
+            keep_lists = old is not None and _index_keys(old) == _index_keys(todo)
+            self._unindex(todo_id, keep_lists)
+            self._todos[todo_id] = todo
+            self._index(todo_id, todo, keep_lists)
+            self._next_id = max(self._next_id, todo_id + 1)
+        elif record["op"] == "del":
+            self._unindex(int(record["id"]))
+            self._todos.pop(int(record["id"]), None)
+        elif record["op"] == "batch":
+            for item in record["records"]:
+                self._apply(item)
+        elif record["op"] == "meta":
+            self._next_id = max(self._next_id, int(record["next_id"]))
+
+    # ------------------------------
+    # secondary indexes
+    # ------------------------------
+    def _index(self, todo_id: int, todo: Dict[str, Any], keep_lists: bool = False) -> None:
+        if not keep_lists:
+            completed, priority = _index_keys(todo)
+            self._by_completed.setdefault(completed, SortedIds()).add(todo_id)
+            self._by_priority.setdefault(priority, SortedIds()).add(todo_id)
+            self._by_both.setdefault((completed, priority), SortedIds()).add(todo_id)
+        self._search_index.add(todo_id, todo.get("task") or "")
+
+    def _unindex(self, todo_id: int, keep_lists: bool = False) -> None:
+        old = self._todos.get(todo_id)
+        if old is None:
+            return
+        if not keep_lists:
+            completed, priority = _index_keys(old)
+            for index, key in (
+                (self._by_completed, completed),
+                (self._by_priority, priority),
+                (self._by_both, (completed, priority)),
+            ):
+                if key in index:
+                    index[key].discard(todo_id)
+        self._search_index.remove(todo_id)
+
+    # ------------------------------
+    # reads
+    # ------------------------------
+    def get(self, todo_id: int) -> Dict[str, Any] | None:
+        with self._lock:
+            todo = self._todos.get(int(todo_id))
+            return dict(todo) if todo is not None else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(todo) for todo in self._todos.values()]
+
+    def __len__(self) -> int:
+        return len(self._todos)
+
+    def find(self, completed: bool | None = None, priority: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Return the todos matching the given filters, in id order.
+
+        Uses the secondary indexes, so only the matching todos are visited.
+        """
+        with self._lock:
+            _, ids = self._matching_ids(completed, priority)
+            return [dict(self._todos[todo_id]) for todo_id in ids]
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        completed: bool | None = None,
+        priority: str | None = None,
+        fields: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of the todos matching the filters, in id order.
+
+        Only the todos on the page are copied, and ``fields`` limits each of
+        them to those keys (the id is always kept). Returns
+        {"total", "offset", "limit", "next_offset", "items"} where
+        next_offset is None on the last page.
+        """
+        offset = max(offset, 0)
+        with self._lock:
+            total, ids = self._matching_ids(completed, priority)
+            page_ids = ids.slice(offset, limit) if isinstance(ids, SortedIds) else itertools.islice(ids, offset, offset + limit)
+            items = [_project(self._todos[todo_id], fields) for todo_id in page_ids]
+        next_offset = offset + len(items)
+        return {
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": next_offset if next_offset < total else None,
+            "items": items,
+        }
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {**self._todos[todo_id], "score": round(score, 4)}
+                for todo_id, score in self._search_index.search(query, limit)
+            ]
+
+    def _matching_ids(self, completed: bool | None, priority: str | None) -> Tuple[int, Iterable[int]]:
+        """
+        Count and ids (in id order) of the todos matching the filters. With a
+        filter that is one of the SortedIds indexes, so a page is a slice of it.
+        """
+        if completed is not None and priority is not None:
+            ids = self._by_both.get((bool(completed), _priority_key(priority)), SortedIds())
+        elif completed is not None:
+            ids = self._by_completed.get(bool(completed), SortedIds())
+        elif priority is not None:
+            ids = self._by_priority.get(_priority_key(priority), SortedIds())
+        else:
+            # ids are handed out in increasing order, so the dict is already sorted
+            return len(self._todos), iter(self._todos)
+        return len(ids), ids
+
+    # ------------------------------
+    # writes
+    # ------------------------------
+    def put(self, todo: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert or replace a todo."""
+        with self._lock:
+            todo = dict(todo)
+            commit = self._append([{"op": "put", "todo": todo}])
+        commit.result()
+        return dict(todo)
+
+    def apply(self, operations: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Apply many operations with a single write to the log.
+
+        Each operation is one of:
+            {"op": "add", "todo": {...}}
+            {"op": "update", "id": 3, "changes": {...}}
+            {"op": "delete", "id": 3}
+
+        Returns one result per operation, in order: the stored todo for
+        add/update (None if the id was not found) and True/False for delete.
+        Blocks until the change is durable.
+        """
+        results, commit = self._apply_operations(operations)
+        if commit is not None:
+            commit.result()
+        return results
+
+    async def apply_async(self, operations: List[Dict[str, Any]]) -> List[Any]:
+        """Same as ``apply`` but waits for the commit without blocking the event loop."""
+        results, commit = self._apply_operations(operations)
+        if commit is not None:
+            await asyncio.wrap_future(commit)
+        return results
+
+    def _apply_operations(self, operations: List[Dict[str, Any]]) -> Tuple[List[Any], Future | None]:
+        for operation in operations:
+            if operation["op"] not in ("add", "update", "delete"):
+                raise ValueError(f"Unknown todo operation: {operation['op']}")
+
+        with self._lock:
+            self._check_writable()
+            records: List[Dict[str, Any]] = []
+            results: List[Any] = []
+            # apply as we go so later operations in the batch see earlier ones
+            for operation in operations:
+                op = operation["op"]
+                if op == "add":
+                    todo = {"id": self._next_id, **operation["todo"]}
+                    record = {"op": "put", "todo": todo}
+                    results.append(dict(todo))
+                elif op == "update":
+                    current = self._todos.get(int(operation["id"]))
+                    if current is None:
+                        results.append(None)
+                        continue
+                    todo = {**current, **operation["changes"], "id": current["id"]}
+                    record = {"op": "put", "todo": todo}
+                    results.append(dict(todo))
+                else:
+                    if int(operation["id"]) not in self._todos:
+                        results.append(False)
+                        continue
+                    record = {"op": "del", "id": int(operation["id"])}
+                    results.append(True)
+                self._apply(record)
+                records.append(record)
+
+            if not records:
+                return results, None
+            return results, self._append(records, applied=True)
+
+    def _append(self, records: List[Dict[str, Any]], applied: bool = False) -> Future:
+        """
+        Queue ``records`` for the writer as one log line, returns the future
+        that is resolved once the line is fsync'd. Must be called with the lock held.
+
+        Several records are wrapped in a single "batch" line so a crash
+        mid-write tears the whole batch (ignored on replay) rather than
+        leaving half of it applied.
+        """
+        self._check_writable()
+        if len(records) == 1:
+            record = records[0]
+        else:
+            record = {"op": "batch", "records": records}
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        if not applied:
+            for item in records:
+                self._apply(item)
+        self._records += len(records)
+
+        # queued under the store lock, so the log order matches the order
+        # the changes were applied in memory
+        self._seq += 1
+        commit: Future = Future()
+        with self._commit_cond:
+            if self._closed:
+                raise RuntimeError("TodoStore is closed")
+            self._check_writable()
+            self._pending.append((self._seq, line, commit))
+            self._inflight += 1
+            self._commit_cond.notify()
+
+        self._maybe_compact()
+        return commit
+
+    # ------------------------------
+    # group commit writer
+    # ------------------------------
+    def _writer_loop(self) -> None:
+        while True:
+            with self._commit_cond:
+                while not self._pending and self._compact_ready is None and not self._closed:
+                    self._commit_cond.wait()
+
+                # let concurrent writers join this group before it is written
+                deadline = time.monotonic() + self.commit_interval
+                while self._pending and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._commit_cond.wait(remaining)
+
+                group, self._pending = self._pending, []
+                compact_ready, self._compact_ready = self._compact_ready, None
+                closed = self._closed
+
+            if group:
+                self._commit(group)
+            if compact_ready is not None:
+                self._finish_compaction(*compact_ready)
+            if closed and not group and compact_ready is None:
+                return
+
+    def _commit(self, group: List[Tuple[int, str, Future]]) -> None:
+        """Append a group of lines with a single write and fsync, then ack them."""
+        # groups queued behind a failed one may build on its changes: fail them too
+        error = self._failed
+        if error is None:
+            try:
+                self._log.write("".join(line for _, line, _ in group))
+                self._log.flush()
+                os.fsync(self._log.fileno())
+            except OSError as e:
+                error = e
+                self._fail(e)
+        if error is not None:
+            self._acked(len(group))
+            for _, _, commit in group:
+                commit.set_exception(error)
+            return
+
+        if self._compaction is not None:
+            # lines newer than the snapshot being written must be carried over to it
+            self._compact_backlog.extend(line for seq, line, _ in group if seq > self._snapshot_seq)
+        # our own write, so it must not look like an external change
+        self._signature = _signature(os.fstat(self._log.fileno()))
+        self._acked(len(group))
+        for _, _, commit in group:
+            commit.set_result(None)
+
+    def _acked(self, count: int) -> None:
+        with self._commit_cond:
+            self._inflight -= count
+
+    def _fail(self, error: OSError) -> None:
+        """
+        A group commit failed on the writer thread. Its changes are already in
+        memory, so from now on nothing is written or compacted (a snapshot
+        would persist them) until ``reload`` replays the log.
+        """
+        print(f"Todo log write failed, refusing writes until reload: {error}")
+        with self._commit_cond:
+            self._failed = error
+        # the buffer may still hold part of the group, and part of it may have
+        # reached the file: a torn line would swallow the next line appended to it
+        try:
+            self._log.close()
+        except OSError:
+            pass
+        try:
+            os.truncate(self.path, self._signature[1])
+            self._log = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            # reload opens the log again
+            print(f"Could not reset the todo log after the failed write: {e}")
+
+    def _check_writable(self) -> None:
+        if self._failed is not None:
+            raise RuntimeError(f"TodoStore could not write its log ({self._failed}), reload it first")
+
+    # ------------------------------
+    # compaction
+    # ------------------------------
+    def _snapshot_lines(self) -> List[str]:
+        # the counter goes first so ids of deleted todos are never handed out again
+        lines = [json.dumps({"op": "meta", "next_id": self._next_id}) + "\n"]
+        lines.extend(
+            json.dumps({"op": "put", "todo": todo}, separators=(",", ":")) + "\n"
+            for todo in self._todos.values()
+        )
+        return lines
+
+    def _write_snapshot(self, lines: List[str], target: str) -> None:
+        tmp_path = target + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, target)
+        self._records = len(lines)
+
+    def _maybe_compact(self) -> None:
+        if self._compaction is not None or self._failed is not None or self._records < COMPACT_MIN_RECORDS:
+            return
+        if self._records < COMPACT_RATIO * max(len(self._todos), 1):
+            return
+        self._start_compaction()
+
+    def _start_compaction(self) -> Future:
+        """
+        Snapshot the todos and write them to a temp file in a background thread.
+
+        The writer thread then appends every line committed after the
+        snapshot and swaps the temp file in, between two group commits.
+        Must be called with the lock held.
+        """
+        if self._compaction is not None:
+            return self._compaction
+        self._check_writable()
+        self._compact_backlog = []
+        self._snapshot_seq = self._seq
+        self._compaction = Future()
+        lines = self._snapshot_lines()
+        threading.Thread(target=self._write_compaction, args=(lines,), daemon=True).start()
+        return self._compaction
+
+    def _write_compaction(self, lines: List[str]) -> None:
+        tmp_path = self.path + ".compact"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.writelines(lines)
+        except OSError as e:
+            print(f"Todo log compaction failed: {e}")
+            self._end_compaction(e)
+            return
+        with self._commit_cond:
+            self._compact_ready = (tmp_path, len(lines))
+            self._commit_cond.notify()
+
+    def _finish_compaction(self, tmp_path: str, snapshot_lines: int) -> None:
+        """Runs on the writer thread, so no group commit is half written."""
+        if self._failed is not None:
+            # the snapshot may hold changes that never reached the log
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            self._end_compaction(self._failed)
+            return
+        try:
+            with open(tmp_path, "a", encoding="utf-8") as file:
+                file.writelines(self._compact_backlog)
+                file.flush()
+                os.fsync(file.fileno())
+            self._log.close()
+            os.replace(tmp_path, self.path)
+            self._log = open(self.path, "a", encoding="utf-8")
+            self._signature = _signature(os.fstat(self._log.fileno()))
+        except OSError as e:
+            print(f"Todo log compaction failed: {e}")
+            if self._log.closed:
+                self._log = open(self.path, "a", encoding="utf-8")
+            self._end_compaction(e)
+            return
+        with self._lock:
+            self._records = snapshot_lines + (self._seq - self._snapshot_seq)
+        self._end_compaction()
+
+    def _end_compaction(self, error: Exception | None = None) -> None:
+        with self._lock:
+            compaction, self._compaction = self._compaction, None
+            self._compact_backlog = []
+        if error is not None:
+            compaction.set_exception(error)
+        else:
+            compaction.set_result(None)
+
+    def compact(self) -> None:
+        """Compact the log now and wait for it to finish."""
+        with self._lock:
+            compaction = self._start_compaction()
+        compaction.result()
+
+    def close(self) -> None:
+        """Wait for queued writes and a running compaction, then stop the writer."""
+        with self._lock:
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.result()
+        with self._commit_cond:
+            self._closed = True
+            self._commit_cond.notify()
+        self._writer.join()
+        self._log.close()
+
+
+# ------------------------------
+# process-wide store cache
+# ------------------------------
+_stores: Dict[Tuple[str, str], TodoBackend] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(
+    path: str | None = None,
+    legacy_path: str = LEGACY_JSON_PATH,
+    backend: str | None = None,
+) -> TodoBackend:
+    """
+    The shared store for ``path``, loaded on first use.
+
+    ``backend`` defaults to the TODO_BACKEND environment variable: "log"
+    (append-only log at ./todo.log) or "sqlite" (./todo.db, or TODO_DB_PATH).
+    Later calls only check whether another process changed the data, so
+    tools can call this on every invocation.
+    """
+    backend = (backend or os.getenv("TODO_BACKEND", "log")).lower()
+    if backend == "log":
+        path = path or LOG_PATH
+        factory = TodoStore
+    elif backend == "sqlite":
+        from sqlite_store import SqliteTodoStore
+
+        path = path or os.getenv("TODO_DB_PATH", SQLITE_PATH)
+        factory = SqliteTodoStore
+    else:
+        raise ValueError(f"Unknown TODO_BACKEND: {backend!r}, expected 'log' or 'sqlite'")
+
+    key = (backend, os.path.abspath(path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = factory(path, legacy_path)
+            return store
+    store.reload()
+    return store
+
+
+def _signature(stat: os.stat_result) -> Tuple[int, int]:
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _index_keys(todo: Dict[str, Any]) -> Tuple[bool, str]:
+    """The values a todo is filed under in the secondary indexes."""
+    return bool(todo.get("completed")), _priority_key(todo.get("priority"))
+
+
+def _priority_key(priority: Any) -> str:
+    """Priorities are matched case-insensitively ("High" == "high")."""
+    return str(priority or "").strip().lower()
+
+
+def _project(todo: Dict[str, Any], fields: List[str] | None) -> Dict[str, Any]:
+    if not fields:
+        return dict(todo)
+    return {key: todo[key] for key in ("id", *fields) if key in todo}
@@ -1,24 +1,12 @@
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel, function_tool , RunContextWrapper
+from agents import Agent, Runner, OpenAIChatCompletionsModel, function_tool , RunContextWrapper
+from agent_common import get_model
 from dotenv import load_dotenv
 from openai.types.responses.tool import WebSearchToolFilters
-import os
 
 load_dotenv()
 
-# Load Gemini API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-# External Gemini client
-externel_client: AsyncOpenAI = AsyncOpenAI(
-    api_key=GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
-
-# LLM model wrapper
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=externel_client,
-)
+# Gemini model from the shared, pooled provider
+llm_model: OpenAIChatCompletionsModel = get_model("gemini-2.5-flash")
 
 # Tools
 @function_tool
@@ -0,0 +1,31 @@
+from agent_common.history import AgentSummarizer, ConversationHistory
+from agent_common.metrics import Histogram, RunTracker, StreamMetrics, stream_metrics
+from agent_common.provider import LLMProvider, get_client, get_model, llm_provider
+from agent_common.rate_limit import RateLimiter, RateLimitedTransport
+from agent_common.response_cache import ResponseCache, cache_key, open_response_cache
+from agent_common.routing import CircuitBreaker, HedgedModel
+from agent_common.sessions import SessionRuns, current_session
+from agent_common.single_flight import SingleFlightModel
+
+__all__ = [
+    "AgentSummarizer",
+    "CircuitBreaker",
+    "ConversationHistory",
+    "HedgedModel",
+    "Histogram",
+    "LLMProvider",
+    "RateLimitedTransport",
+    "RateLimiter",
+    "ResponseCache",
+    "RunTracker",
+    "SessionRuns",
+    "SingleFlightModel",
+    "StreamMetrics",
+    "cache_key",
+    "current_session",
+    "get_client",
+    "get_model",
+    "llm_provider",
+    "open_response_cache",
+    "stream_metrics",
+]
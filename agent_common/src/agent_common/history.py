@@ -0,0 +1,143 @@
+import asyncio
+import os
+from collections import deque
+from typing import Awaitable, Callable
+
+from agents import Agent, Model, Runner
+
+
+# ------------------------------
+# Token-budgeted conversation history
+# ------------------------------
+# Sending the whole chat on every turn makes prompts, latency and memory grow
+# without limit. ConversationHistory keeps only the most recent messages that
+# fit in a token budget. The token estimate of each message is computed once,
+# when it is added, and a running total is kept, so trimming is O(evicted).
+#
+# Optionally, evicted messages are folded into a rolling summary by a
+# background task, so the next turn never waits for the summary model; it just
+# uses the latest summary that is ready.
+
+TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "8000"))
+
+# rough tokens-per-character ratio of English text for GPT / Gemini tokenizers
+CHARS_PER_TOKEN = 4
+# per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Message = dict[str, str]
+Summarizer = Callable[[str | None, list[Message]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationHistory:
+    """
+    Most recent chat messages within ``token_budget`` tokens, plus an optional
+    rolling summary of everything older.
+    """
+
+    def __init__(self, token_budget: int = TOKEN_BUDGET, summarizer: Summarizer | None = None):
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.summary: str | None = None
+        self._window: deque[tuple[Message, int]] = deque()
+        self._window_tokens = 0
+        self._summary_tokens = 0
+        self._to_fold: list[Message] = []
+        self._folding: asyncio.Task | None = None
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens of what ``messages()`` returns."""
+        return self._window_tokens + self._summary_tokens
+
+    def add_user(self, content: str) -> None:
+        self._add({"role": "user", "content": content})
+
+    def add_assistant(self, content: str) -> None:
+        self._add({"role": "assistant", "content": content})
+
+    def _add(self, message: Message) -> None:
+        tokens = estimate_tokens(message["content"])
+        self._window.append((message, tokens))
+        self._window_tokens += tokens
+        self._trim()
+
+    def _trim(self) -> None:
+        evicted: list[Message] = []
+        # the newest message always stays, even if it alone is over budget
+        while len(self._window) > 1 and self.tokens > self.token_budget:
+            evicted.append(self._evict())
+        # don't start the window with an assistant reply to an evicted question
+        while len(self._window) > 1 and self._window[0][0]["role"] == "assistant":
+            evicted.append(self._evict())
+
+        if evicted and self.summarizer is not None:
+            self._to_fold.extend(evicted)
+            self._schedule_fold()
+
+    def _evict(self) -> Message:
+        message, tokens = self._window.popleft()
+        self._window_tokens -= tokens
+        return message
+
+    def messages(self) -> list[Message]:
+        """The input for the next run: the summary (if any) and the recent messages."""
+        window = [message for message, _ in self._window]
+        if not self.summary:
+            return window
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}, *window]
+
+    # ------------------------------
+    # rolling summary
+    # ------------------------------
+    def _schedule_fold(self) -> None:
+        if self._folding is None or self._folding.done():
+            self._folding = asyncio.get_running_loop().create_task(self._fold())
+
+    async def _fold(self) -> None:
+        # messages evicted while a summary is being written are picked up by the next round
+        while self._to_fold:
+            batch, self._to_fold = self._to_fold, []
+            try:
+                summary = await self.summarizer(self.summary, batch)
+            except Exception as e:
+                print(f"History summary failed, dropping {len(batch)} old messages: {e}")
+                continue
+            self.summary = summary
+            self._summary_tokens = estimate_tokens(summary)
+            # a longer summary may push the window over budget
+            self._trim()
+
+    async def wait_for_summary(self) -> None:
+        """Wait for a running summary to finish, for tests and shutdown."""
+        if self._folding is not None:
+            await self._folding
+
+
+class AgentSummarizer:
+    """
+    Summarizer that folds old messages into the running summary with ``model``.
+    Use a small, fast model: it runs in the background after a turn.
+    """
+
+    def __init__(self, model: Model | str, max_words: int = 150):
+        self.agent = Agent(
+            name="HistorySummarizer",
+            instructions=(
+                "You maintain a running summary of a conversation. You get the previous summary "
+                "(possibly empty) and the messages that follow it. Reply with an updated summary of "
+                f"at most {max_words} words that keeps facts, decisions and open questions. "
+                "Reply with the summary only."
+            ),
+            model=model,
+        )
+
+    async def __call__(self, previous_summary: str | None, messages: list[Message]) -> str:
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+        prompt = f"Previous summary:\n{previous_summary or '(none)'}\n\nMessages:\n{transcript}"
+        result = await Runner.run(self.agent, prompt)
+        return str(result.final_output)
@@ -0,0 +1,258 @@
+import asyncio
+import atexit
+import json
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from agents import Agent, RunConfig
+from openai.types.responses import ResponseTextDeltaEvent
+
+
+# ------------------------------
+# Streaming latency metrics
+# ------------------------------
+# RunTracker watches the events of one Runner.run_streamed call and records,
+# per agent and model:
+#   ttft_ms       start of the run -> first text delta
+#   token_gap_ms  time between consecutive text deltas
+#   tool_call_ms  tool_call_item -> matching tool_call_output_item
+#   run_ms        start of the run -> end of the stream
+#   abandoned_ms  run time of runs cancelled before they finished
+#
+# Cancelled runs also count the text deltas and tool calls that were in
+# flight, so the work thrown away by superseded runs shows up in the totals.
+#
+# Values go into fixed-bucket histograms: recording one is a bisect and two
+# additions, and memory does not grow with traffic. ``snapshot`` returns counts
+# and estimated percentiles; ``dump`` writes them to METRICS_DUMP_PATH, which is
+# also done every METRICS_DUMP_INTERVAL seconds and at exit.
+
+DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "./stream_metrics.json")
+DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))
+
+# bucket upper bounds in milliseconds, about 1.5x apart, from 1 ms to 5 minutes
+BUCKETS_MS = [base * 10**exp for exp in range(6) for base in (1, 1.5, 2, 3, 5, 7) if base * 10**exp <= 300_000]
+
+
+class Histogram:
+    """
+    Count of observations per bucket, plus sum, min and max.
+    """
+
+    def __init__(self, bounds: list[float] = BUCKETS_MS):
+        self.bounds = bounds
+        # the last slot counts everything above the largest bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the ``pct`` percentile, capped at the max seen."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(pct / 100 * self.count))
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, 3) if self.count else 0.0,
+            "min": round(self.min, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {str(bound): count for bound, count in zip(self.bounds + ["+inf"], self.counts) if count},
+        }
+
+
+class StreamMetrics:
+    """
+    Histograms keyed by (metric, agent, model), run counters by status and
+    other counters by name.
+    """
+
+    def __init__(self, dump_path: str | None = DUMP_PATH, dump_interval: float = DUMP_INTERVAL):
+        self.started_at = time.time()
+        self._histograms: dict[tuple[str, str, str], Histogram] = {}
+        self._runs: dict[tuple[str, str, str], int] = {}
+        self._counters: dict[tuple[str, str, str], int] = {}
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._last_dump = time.monotonic()
+        if dump_path:
+            atexit.register(self.dump)
+
+    def observe(self, metric: str, agent: str, model: str, value_ms: float) -> None:
+        key = (metric, agent, model)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value_ms)
+
+    def add(self, counter: str, agent: str, model: str, amount: int = 1) -> None:
+        key = (counter, agent, model)
+        self._counters[key] = self._counters.get(key, 0) + amount
+
+    def count_run(self, agent: str, model: str, status: str) -> None:
+        key = (agent, model, status)
+        self._runs[key] = self._runs.get(key, 0) + 1
+        if self.dump_path and time.monotonic() - self._last_dump >= self.dump_interval:
+            self.dump()
+
+    def start_run(self, agent: Agent, run_config: RunConfig | None = None) -> "RunTracker":
+        return RunTracker(self, agent.name, model_name(agent, run_config))
+
+    def snapshot(self) -> dict[str, Any]:
+        series: dict[str, dict[str, Any]] = {}
+        for (agent, model, status), count in sorted(self._runs.items()):
+            entry = series.setdefault(f"{agent}|{model}", {"agent": agent, "model": model, "runs": {}})
+            entry["runs"][status] = count
+        for (counter, agent, model), count in sorted(self._counters.items()):
+            entry = series.setdefault(f"{agent}|{model}", {"agent": agent, "model": model, "runs": {}})
+            entry[counter] = count
+        for (metric, agent, model), histogram in sorted(self._histograms.items()):
+            entry = series.setdefault(f"{agent}|{model}", {"agent": agent, "model": model, "runs": {}})
+            entry[metric] = histogram.to_dict()
+        return {"started_at": self.started_at, "generated_at": time.time(), "series": list(series.values())}
+
+    def dump(self, path: str | None = None) -> None:
+        path = path or self.dump_path
+        self._last_dump = time.monotonic()
+        # nothing to report in processes that never streamed a run
+        if not path or not self._runs:
+            return
+        tmp = f"{path}.tmp"
+        Path(tmp).write_text(json.dumps(self.snapshot(), indent=2))
+        os.replace(tmp, path)
+
+    def reset(self) -> None:
+        self._histograms.clear()
+        self._runs.clear()
+        self._counters.clear()
+        self.started_at = time.time()
+
+
+class RunTracker:
+    """
+    Timings of one streamed run. Create it right before ``Runner.run_streamed``
+    so time to first token includes the request, then iterate the events
+    through ``track``:
+
+        run = stream_metrics.start_run(agent, config)
+        result = Runner.run_streamed(agent, input, run_config=config)
+        async for event in run.track(result.stream_events()):
+            ...
+
+    A run that is not streamed can use it as a context manager, which only
+    records the run time and how the run ended:
+
+        with stream_metrics.start_run(agent) as run:
+            result = await Runner.run(agent, input)
+    """
+
+    def __init__(self, metrics: StreamMetrics, agent: str, model: str):
+        self.metrics = metrics
+        self.agent = agent
+        self.model = model
+        self.started = time.perf_counter()
+        self._last_token: float | None = None
+        self.deltas = 0
+        self._tool_calls: dict[str, float] = {}
+        self._finished = False
+
+    def _observe(self, metric: str, since: float, now: float) -> None:
+        self.metrics.observe(metric, self.agent, self.model, (now - since) * 1000)
+
+    def on_event(self, event) -> None:
+        if event.type == "raw_response_event":
+            if isinstance(event.data, ResponseTextDeltaEvent) and event.data.delta:
+                now = time.perf_counter()
+                if self._last_token is None:
+                    self._observe("ttft_ms", self.started, now)
+                else:
+                    self._observe("token_gap_ms", self._last_token, now)
+                self._last_token = now
+                self.deltas += 1
+        elif event.type == "run_item_stream_event":
+            if event.item.type == "tool_call_item":
+                self._tool_calls[_call_id(event.item.raw_item)] = time.perf_counter()
+            elif event.item.type == "tool_call_output_item":
+                started = self._tool_calls.pop(_call_id(event.item.raw_item), None)
+                if started is not None:
+                    self._observe("tool_call_ms", started, time.perf_counter())
+
+    def finish(self, status: str = "ok") -> None:
+        if self._finished:
+            return
+        self._finished = True
+        now = time.perf_counter()
+        self._observe("run_ms", self.started, now)
+        if status == "cancelled":
+            self._observe("abandoned_ms", self.started, now)
+            self.metrics.add("abandoned_deltas", self.agent, self.model, self.deltas)
+            self.metrics.add("abandoned_tool_calls", self.agent, self.model, len(self._tool_calls))
+        self.metrics.count_run(self.agent, self.model, status)
+
+    async def track(self, events: AsyncIterator) -> AsyncIterator:
+        status = "error"
+        try:
+            async for event in events:
+                self.on_event(event)
+                yield event
+            status = "ok"
+        except (asyncio.CancelledError, GeneratorExit):
+            status = "cancelled"
+            raise
+        finally:
+            self.finish(status)
+
+    def __enter__(self) -> "RunTracker":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.finish("ok")
+        elif issubclass(exc_type, asyncio.CancelledError):
+            self.finish("cancelled")
+        else:
+            self.finish("error")
+
+
+def model_name(agent: Agent, run_config: RunConfig | None = None) -> str:
+    # a model set on the RunConfig overrides the agent's own
+    model = (run_config.model if run_config else None) or agent.model
+    if model is None:
+        return "default"
+    if isinstance(model, str):
+        return model
+    return getattr(model, "model", type(model).__name__)
+
+
+def _call_id(raw_item) -> str:
+    # function calls are pydantic models, their outputs plain dicts
+    if isinstance(raw_item, dict):
+        return str(raw_item.get("call_id") or raw_item.get("id"))
+    return str(getattr(raw_item, "call_id", None) or getattr(raw_item, "id", None))
+
+
+stream_metrics = StreamMetrics()
@@ -0,0 +1,134 @@
+import asyncio
+import importlib.util
+import os
+
+import httpx
+from agents import AsyncOpenAI, OpenAIChatCompletionsModel
+
+from agent_common import rate_limit
+
+
+# ------------------------------
+# One pooled model provider per process
+# ------------------------------
+# Every script used to build its own AsyncOpenAI client for the Gemini
+# OpenAI-compatible endpoint, each with its own default connection pool.
+# LLMProvider owns the one AsyncOpenAI client of the process, on top of one
+# tuned httpx client (HTTP/2, keep-alive, pool limits, timeouts), and hands
+# out one OpenAIChatCompletionsModel per model name:
+#
+#     from agent_common import get_model
+#     llm_model = get_model("gemini-2.5-flash")
+#
+# The client is built on first use, so GOOGLE_API_KEY can come from a .env
+# file loaded after the import. Pooled connections belong to the event loop
+# that opened them, so the transport keeps one pool per (process, loop), the
+# same way the Mongo client provider in 06_tool_call does; a script has one
+# loop and so one pool. Unless LLM_RATE_LIMIT=0, every request first goes
+# through the client-side rate limiter of agent_common.rate_limit.
+
+BASE_URL = os.getenv("LLM_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
+API_KEY_ENV = os.getenv("LLM_API_KEY_ENV", "GOOGLE_API_KEY")
+
+# HTTP/2 needs the h2 package (httpx[http2]); without it the pool speaks HTTP/1.1
+HTTP2 = os.getenv("LLM_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+WRITE_TIMEOUT = float(os.getenv("LLM_WRITE_TIMEOUT", "10"))
+POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+
+class LoopPooledTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport with one connection pool per (process, event loop).
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._pools: dict[tuple[int, asyncio.AbstractEventLoop], httpx.AsyncHTTPTransport] = {}
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        key = (os.getpid(), asyncio.get_running_loop())
+        pool = self._pools.get(key)
+        if pool is None:
+            # pools of closed loops or of the parent process can't be used (or closed) from here
+            self._pools = {k: v for k, v in self._pools.items() if k[0] == key[0] and not k[1].is_closed()}
+            pool = self._pools[key] = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pool = self._pools.pop((os.getpid(), asyncio.get_running_loop()), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+class LLMProvider:
+    """
+    The AsyncOpenAI client of the process and its models, by name.
+    """
+
+    def __init__(self, base_url: str = BASE_URL, api_key: str | None = None):
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client: AsyncOpenAI | None = None
+        self._limited: rate_limit.RateLimitedTransport | None = None
+        self._models: dict[str, OpenAIChatCompletionsModel] = {}
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            transport: httpx.AsyncBaseTransport = LoopPooledTransport(
+                http2=HTTP2,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY,
+                ),
+            )
+            if rate_limit.ENABLED:
+                transport = self._limited = rate_limit.RateLimitedTransport(transport)
+            http_client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(connect=CONNECT_TIMEOUT, read=READ_TIMEOUT, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT),
+                follow_redirects=True,
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key or os.getenv(API_KEY_ENV),
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=MAX_RETRIES,
+            )
+        return self._client
+
+    def model(self, name: str) -> OpenAIChatCompletionsModel:
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = OpenAIChatCompletionsModel(model=name, openai_client=self.client)
+        return model
+
+    def rate_limit_stats(self) -> dict:
+        """Queue depth, admissions and queue wait per API key (empty when the limiter is off)."""
+        return self._limited.stats() if self._limited is not None else {}
+
+    async def close(self) -> None:
+        """Close the pool of the running loop, for a clean shutdown."""
+        if self._client is not None:
+            await self._client.close()
+
+
+llm_provider = LLMProvider()
+
+
+def get_model(name: str) -> OpenAIChatCompletionsModel:
+    return llm_provider.model(name)
+
+
+def get_client() -> AsyncOpenAI:
+    return llm_provider.client
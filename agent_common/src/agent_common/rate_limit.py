@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+import httpx
+
+from agent_common.metrics import Histogram
+from agent_common.sessions import current_session
+
+
+# ------------------------------
+# Client-side rate limiting of model calls
+# ------------------------------
+# Without a limit, many sessions running agents at once run into provider 429s,
+# and the SDK's retries then add seconds of tail latency (and more 429s).
+# RateLimiter admits requests through two token buckets per API key:
+#
+#   requests  LLM_RPS per second, bursts of up to LLM_BURST
+#   tokens    LLM_TPM per minute; a request costs its prompt estimate
+#             (body bytes / 4) plus LLM_EXPECTED_OUTPUT_TOKENS
+#
+# Requests that don't fit wait in one FIFO per chat session, and the queues
+# are served round-robin, so one busy session can't starve the others. A 429
+# that gets through anyway pauses the key for its Retry-After.
+#
+# RateLimitedTransport applies the limiter to every HTTP request of the shared
+# provider client, so every agent and every SDK retry goes through it.
+
+ENABLED = os.getenv("LLM_RATE_LIMIT", "1") == "1"
+RPS = float(os.getenv("LLM_RPS", "10"))
+BURST = float(os.getenv("LLM_BURST", str(RPS)))
+TPM = float(os.getenv("LLM_TPM", "1000000"))
+EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "512"))
+CHARS_PER_TOKEN = 4
+# read from the raw body, parsing the whole JSON prompt per request would cost more than the limiter
+MAX_TOKENS_RE = re.compile(rb'"max(?:_completion)?_tokens"\s*:\s*(\d+)')
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class TokenBucket:
+    """
+    ``rate`` tokens per second, holding at most ``capacity``.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 when they are now)."""
+        self._refill(time.monotonic())
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate) if self.rate > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        # may go negative after a 429 pause or when the cost is over capacity, later requests wait it off
+        self._refill(time.monotonic())
+        self.tokens -= min(amount, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+
+class _Waiter:
+    def __init__(self, cost: float):
+        self.cost = cost
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+
+
+class RateLimiter:
+    """
+    Request and token buckets of one API key, with fair per-session queueing.
+    """
+
+    def __init__(self, rps: float = RPS, burst: float = BURST, tpm: float = TPM):
+        self.requests = TokenBucket(rps, max(burst, 1.0))
+        self.tokens = TokenBucket(tpm / 60, tpm)
+        # session -> waiting requests; the first session in the dict is served next
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._pump: asyncio.Task | None = None
+        self.admitted = 0
+        self.queued = 0
+        self.throttled = 0
+        self.max_depth = 0
+        self.wait_ms = Histogram()
+
+    def _wait_time(self, cost: float) -> float:
+        return max(self.requests.wait_time(1), self.tokens.wait_time(cost))
+
+    def _take(self, cost: float) -> None:
+        self.requests.take(1)
+        self.tokens.take(cost)
+        self.admitted += 1
+
+    async def acquire(self, cost: float) -> None:
+        """Wait until a request costing ``cost`` tokens may be sent."""
+        if not self._queues and self._wait_time(cost) == 0:
+            self._take(cost)
+            return
+
+        waiter = _Waiter(cost)
+        self._queues.setdefault(current_session.get(), deque()).append(waiter)
+        self.queued += 1
+        self.max_depth = max(self.max_depth, self.depth())
+        self._ensure_pump()
+        try:
+            await waiter.future
+        finally:
+            # a cancelled waiter is skipped by the pump
+            waiter.future.cancel()
+
+    def _ensure_pump(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._pump is not None and not self._pump.done():
+            if self._pump.get_loop() is loop:
+                return
+            # left over from a closed loop, its waiters can't be woken any more
+            self._queues = OrderedDict((s, q) for s, q in self._queues.items() if q and q[-1].future.get_loop() is loop)
+        self._pump = loop.create_task(self._serve())
+
+    async def _serve(self) -> None:
+        while self._queues:
+            session, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if waiter.future.done():
+                self._pop(session, queue)
+                continue
+
+            delay = self._wait_time(waiter.cost)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            self._take(waiter.cost)
+            self._pop(session, queue)
+            self.wait_ms.observe((time.monotonic() - waiter.queued_at) * 1000)
+            waiter.future.set_result(None)
+            # round-robin: this session goes to the back of the line
+            if session in self._queues:
+                self._queues.move_to_end(session)
+
+    def _pop(self, session: str, queue: deque[_Waiter]) -> None:
+        queue.popleft()
+        if not queue:
+            del self._queues[session]
+
+    def throttle(self, retry_after: float) -> None:
+        """The provider answered 429: send nothing on this key for ``retry_after`` seconds."""
+        self.throttled += 1
+        self.requests.pause(retry_after)
+
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.depth(),
+            "queue_depth_by_session": {session: len(queue) for session, queue in self._queues.items()},
+            "max_queue_depth": self.max_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "throttled_429": self.throttled,
+            "queue_wait_ms": self.wait_ms.to_dict(),
+        }
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that sends each request through the RateLimiter of its API key.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+        self.limiters: dict[str, RateLimiter] = {}
+
+    def limiter(self, request: httpx.Request) -> RateLimiter:
+        # keyed by a hash, the key itself doesn't end up in metrics
+        auth = request.headers.get("authorization", "")
+        key = "key-" + hashlib.sha256(auth.encode()).hexdigest()[:8]
+        limiter = self.limiters.get(key)
+        if limiter is None:
+            limiter = self.limiters[key] = RateLimiter()
+        return limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter = self.limiter(request)
+        await limiter.acquire(estimate_cost(request))
+        response = await self.inner.handle_async_request(request)
+        if response.status_code == 429:
+            limiter.throttle(retry_after(response))
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {key: limiter.stats() for key, limiter in self.limiters.items()}
+
+
+def estimate_cost(request: httpx.Request) -> float:
+    """Tokens a request will use: its prompt estimate plus the output it may produce."""
+    body = request.content
+    match = MAX_TOKENS_RE.search(body) if body else None
+    output = int(match.group(1)) if match else EXPECTED_OUTPUT_TOKENS
+    return len(body) / CHARS_PER_TOKEN + output
+
+
+def retry_after(response: httpx.Response) -> float:
+    try:
+        return float(response.headers.get("retry-after", DEFAULT_RETRY_AFTER))
+    except ValueError:
+        return DEFAULT_RETRY_AFTER
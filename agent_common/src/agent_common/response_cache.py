@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from agents import Agent, RunConfig
+
+from agent_common.metrics import model_name
+
+
+# ------------------------------
+# Exact-match response cache
+# ------------------------------
+# Many chats open with the same questions. The cache maps a hash of
+# (agent name, instructions, model, conversation so far) to the final answer,
+# so a repeated conversation is answered without calling the model.
+#
+# Two tiers: an in-memory LRU with a TTL and a byte cap, in front of a SQLite
+# file that survives restarts (with its own byte cap). A disk hit is copied
+# into memory. Disk access runs in a worker thread, off the event loop.
+#
+# Only exact matches hit: the history is normalised (roles, collapsed
+# whitespace) and nothing else. The cache is off unless RESPONSE_CACHE=1.
+
+ENABLED = os.getenv("RESPONSE_CACHE", "0") == "1"
+TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# an empty path keeps the cache in memory only
+DISK_PATH = os.getenv("RESPONSE_CACHE_PATH", "./response_cache.db")
+DISK_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def cache_key(agent: Agent, messages: list[dict[str, str]], run_config: RunConfig | None = None) -> str | None:
+    """
+    Stable hash of what decides the answer, or None when it can't be cached
+    (instructions built by a function can differ between calls).
+    """
+    if not isinstance(agent.instructions, (str, type(None))):
+        return None
+    payload = {
+        "agent": agent.name,
+        "instructions": agent.instructions,
+        "model": model_name(agent, run_config),
+        "history": [[message["role"], " ".join(str(message["content"]).split())] for message in messages],
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU over an optional SQLite tier, both bounded by bytes and TTL.
+    """
+
+    def __init__(
+        self,
+        ttl: float = TTL_SECONDS,
+        max_bytes: int = MAX_BYTES,
+        disk_path: str | None = DISK_PATH,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        # key -> (answer, expires_at, size in bytes)
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db: sqlite3.Connection | None = None
+        # the connection is shared by the worker threads of asyncio.to_thread
+        self._db_lock = threading.Lock()
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, answer TEXT NOT NULL, expires_at REAL NOT NULL, "
+                "size INTEGER NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+            self._db.commit()
+            # running total, so a write doesn't have to sum the table
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    async def get(self, key: str) -> str | None:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            answer, expires_at, size = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return answer
+            self._drop(key)
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key, now)
+            if row is not None:
+                answer, expires_at = row
+                self.disk_hits += 1
+                # keep the stored expiry, a disk hit must not make the answer live longer
+                self._remember(key, answer, expires_at)
+                return answer
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, answer: str) -> None:
+        expires_at = time.time() + self.ttl
+        self._remember(key, answer, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, answer, expires_at)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    # ------------------------------
+    # memory tier
+    # ------------------------------
+    def _remember(self, key: str, answer: str, expires_at: float) -> None:
+        size = len(answer.encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (answer, expires_at, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    # ------------------------------
+    # disk tier
+    # ------------------------------
+    def _disk_get(self, key: str, now: float) -> tuple[str, float] | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT answer, expires_at FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return row[0], row[1]
+
+    def _disk_set(self, key: str, answer: str, expires_at: float) -> None:
+        size = len(answer.encode())
+        now = time.time()
+        if size > self.disk_max_bytes:
+            return
+        with self._db_lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, answer, expires_at, size, used_at) VALUES (?, ?, ?, ?, ?)",
+                (key, answer, expires_at, size, now),
+            )
+            self._disk_bytes += size - (old[0] if old else 0)
+
+            if self._disk_bytes > self.disk_max_bytes:
+                self._disk_bytes -= self._db.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM responses WHERE expires_at <= ?", (now,)
+                ).fetchone()[0]
+                self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                # then the least recently used rows, until the file is under its cap
+                rows = self._db.execute("SELECT key, size FROM responses WHERE key != ? ORDER BY used_at", (key,))
+                evict = []
+                for old_key, old_size in rows:
+                    if self._disk_bytes <= self.disk_max_bytes:
+                        break
+                    evict.append((old_key,))
+                    self._disk_bytes -= old_size
+                self._db.executemany("DELETE FROM responses WHERE key = ?", evict)
+            self._db.commit()
+
+
+def open_response_cache() -> ResponseCache | None:
+    """The cache configured by the RESPONSE_CACHE* variables, or None when it is off."""
+    return ResponseCache() if ENABLED else None
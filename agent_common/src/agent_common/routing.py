@@ -0,0 +1,279 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+from agents import Model, ModelResponse
+
+
+# ------------------------------
+# Hedged requests and failover between models
+# ------------------------------
+# A slow upstream call makes the whole chat turn slow. HedgedModel sends each
+# call to a primary model and, if it has not answered (or, when streaming,
+# sent its first event) after the primary's recent p95 latency, sends the same
+# call to a secondary model too. The first answer wins and the other call is
+# cancelled, so only the slowest ~5% of calls cost a duplicate. A primary
+# that fails before the delay is retried on the secondary right away.
+#
+# Each model has a circuit breaker. BREAKER_FAILURES failures or timeouts in a
+# row (a timeout being a call slower than BREAKER_SLOW_SECONDS, or one that
+# lost the race to the hedge) open it: for
+# BREAKER_RESET_SECONDS calls skip that model and go straight to the other one.
+# After that a single trial call decides whether it closes again.
+#
+# Each stream is driven in a task of its own and handed over through a queue,
+# so the SDK's streaming code (and its tracing spans) never changes tasks.
+
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "300"))
+# until there are enough samples for a percentile
+HEDGE_DEFAULT_DELAY_MS = float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "2000"))
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+BREAKER_SLOW_SECONDS = float(os.getenv("BREAKER_SLOW_SECONDS", "30"))
+
+_END = object()
+
+
+class CircuitBreaker:
+    """
+    closed -> open after ``failures`` bad calls in a row -> half-open after
+    ``reset_seconds`` (one trial call) -> closed or open again.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = "half-open"
+        if self.state == "half-open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record(self, ok: bool) -> None:
+        self._trial_running = False
+        if ok:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            return
+        self.consecutive_failures += 1
+        if self.state == "half-open" or self.consecutive_failures >= self.failures:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """A call that was cancelled before it could tell anything."""
+        self._trial_running = False
+
+
+class _Route:
+    """A model with its breaker and recent latencies."""
+
+    def __init__(self, model: Model):
+        self.model = model
+        self.name = getattr(model, "model", type(model).__name__)
+        self.breaker = CircuitBreaker()
+        self.response_ms: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.first_event_ms: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def finish(self, started: float, ok: bool) -> None:
+        slow = time.monotonic() - started > BREAKER_SLOW_SECONDS
+        self.breaker.record(ok and not slow)
+
+    def lost(self) -> None:
+        """The other model answered first: as bad as a timeout, or a slow model is hedged forever."""
+        self.breaker.record(False)
+
+
+def hedge_delay(latencies_ms: deque[float]) -> float:
+    """Seconds to wait for the primary before hedging."""
+    if len(latencies_ms) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY_MS / 1000
+    ordered = sorted(latencies_ms)
+    value = ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE / 100))]
+    return max(value, HEDGE_MIN_DELAY_MS) / 1000
+
+
+class HedgedModel(Model):
+    """
+    Model that hedges slow calls to ``primary`` with ``secondary`` and fails
+    over between them with circuit breakers.
+    """
+
+    def __init__(self, primary: Model, secondary: Model):
+        self.primary = _Route(primary)
+        self.secondary = _Route(secondary)
+        # for metrics and cache keys that look at ``model.model``
+        self.model = self.primary.name
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def _routes(self) -> tuple[_Route, _Route | None]:
+        """The route to call first, and the one allowed to hedge it (if any)."""
+        self.calls += 1
+        if self.primary.breaker.allow():
+            return self.primary, self.secondary
+        if self.secondary.breaker.allow():
+            self.failovers += 1
+            return self.secondary, None
+        # both open: better a slow answer than none
+        return self.primary, None
+
+    # ------------------------------
+    # get_response
+    # ------------------------------
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        first, backup = self._routes()
+        calls = {asyncio.create_task(self._respond(first, args, kwargs)): first}
+        try:
+            delay = hedge_delay(first.response_ms)
+            done, _ = await asyncio.wait(calls, timeout=delay)
+            failed = any(task.exception() is not None for task in done)
+            if (failed or not done) and backup is not None and backup.breaker.allow():
+                self.hedged += 1
+                calls[asyncio.create_task(self._respond(backup, args, kwargs))] = backup
+
+            error: BaseException | None = None
+            pending = set(calls)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if calls[task] is not first:
+                            self.hedge_wins += 1
+                        for other in pending:
+                            calls[other].lost()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in calls:
+                task.cancel()
+
+    async def _respond(self, route: _Route, args: tuple, kwargs: dict) -> ModelResponse:
+        started = time.monotonic()
+        try:
+            response = await route.model.get_response(*args, **kwargs)
+        except asyncio.CancelledError:
+            # lost the race (see lost()) or the caller gave up; only a lower bound of
+            # the latency, which would pull the percentile down to the hedge delay
+            route.breaker.release()
+            raise
+        except Exception:
+            route.finish(started, ok=False)
+            raise
+        route.response_ms.append((time.monotonic() - started) * 1000)
+        route.finish(started, ok=True)
+        return response
+
+    # ------------------------------
+    # stream_response
+    # ------------------------------
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        first, backup = self._routes()
+        streams = {first: self._start_stream(first, args, kwargs)}
+        try:
+            winner: _Route | None = None
+            head: Any = _END
+            error: BaseException | None = None
+
+            waiting = {asyncio.ensure_future(streams[first][1].get()): first}
+            done, _ = await asyncio.wait(waiting, timeout=hedge_delay(first.first_event_ms))
+            failed = any(isinstance(getter.result(), BaseException) for getter in done)
+            if (failed or not done) and backup is not None and backup.breaker.allow():
+                self.hedged += 1
+                streams[backup] = self._start_stream(backup, args, kwargs)
+                waiting[asyncio.ensure_future(streams[backup][1].get())] = backup
+
+            # the first stream to produce an event wins; a stream that fails first doesn't
+            pending = set(waiting)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for getter in done:
+                    item = getter.result()
+                    if isinstance(item, BaseException):
+                        error = item
+                    else:
+                        winner, head = waiting[getter], item
+                        break
+            for getter in pending:
+                getter.cancel()
+            if winner is None:
+                raise error
+
+            if winner is not first:
+                self.hedge_wins += 1
+            for route, (task, _) in streams.items():
+                if route is not winner and not task.done():
+                    route.lost()
+                    task.cancel()
+
+            queue = streams[winner][1]
+            item = head
+            while item is not _END:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+                item = await queue.get()
+        finally:
+            for task, _ in streams.values():
+                task.cancel()
+
+    def _start_stream(self, route: _Route, args: tuple, kwargs: dict) -> tuple[asyncio.Task, asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue()
+        return asyncio.create_task(self._pump_stream(route, queue, args, kwargs)), queue
+
+    async def _pump_stream(self, route: _Route, queue: asyncio.Queue, args: tuple, kwargs: dict) -> None:
+        started = time.monotonic()
+        first_event = True
+        try:
+            async for event in route.model.stream_response(*args, **kwargs):
+                if first_event:
+                    route.first_event_ms.append((time.monotonic() - started) * 1000)
+                    first_event = False
+                queue.put_nowait(event)
+        except asyncio.CancelledError:
+            route.breaker.release()
+            raise
+        except Exception as e:
+            route.finish(started, ok=False)
+            queue.put_nowait(e)
+            return
+        route.finish(started, ok=True)
+        queue.put_nowait(_END)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "routes": {
+                route.name: {
+                    "breaker": route.breaker.state,
+                    "breaker_trips": route.breaker.trips,
+                    "hedge_delay_ms": round(hedge_delay(route.response_ms) * 1000, 1),
+                    "stream_hedge_delay_ms": round(hedge_delay(route.first_event_ms) * 1000, 1),
+                }
+                for route in (self.primary, self.secondary)
+            },
+        }
@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+
+# ------------------------------
+# One run per chat session
+# ------------------------------
+# A user who sends a second message while the first answer is still running
+# would otherwise get two full runs, and the first one keeps calling the model
+# and tools for an answer nobody reads. SessionRuns remembers the task that
+# handles the latest message of each session; a newer message cancels it.
+#
+# Cancelling the handler task cancels whatever it awaits. For a streamed run
+# the SDK drives the model and tools in its own task, so the handler must also
+# call ``result.cancel()`` when it is cancelled, see 03_streaming/main.py.
+
+# the session a run belongs to, for code below the handler (the rate limiter's fair queueing)
+current_session: ContextVar[str] = ContextVar("current_session", default="default")
+
+# how long a new message waits for the cancelled run to clean up
+CANCEL_WAIT_SECONDS = 2.0
+
+
+class SessionRuns:
+    """
+    Session id -> task of the run currently answering it.
+    """
+
+    def __init__(self, cancel_wait: float = CANCEL_WAIT_SECONDS):
+        self.cancel_wait = cancel_wait
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._superseded: set[asyncio.Task] = set()
+        self.superseded_runs = 0
+
+    @asynccontextmanager
+    async def latest(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Run the body as the only run of ``session_id``. A run still going for
+        the session is cancelled first, and this one is cancelled in turn if a
+        newer message arrives; that cancellation ends the body quietly.
+        """
+        task = asyncio.current_task()
+        previous = self._tasks.get(session_id)
+        self._tasks[session_id] = task
+        session_token = current_session.set(session_id)
+        entered = False
+
+        try:
+            if previous is not None and previous is not task and not previous.done():
+                self._superseded.add(previous)
+                self.superseded_runs += 1
+                previous.cancel()
+                # let it unwind (and skip its history update) before this run reads the history
+                await asyncio.wait({previous}, timeout=self.cancel_wait)
+            entered = True
+            yield
+        except asyncio.CancelledError:
+            # superseded before the body started: the context manager has to raise
+            if task not in self._superseded or not entered:
+                raise
+            # superseded by a newer message: not an error, the newer run answers instead
+            task.uncancel()
+        finally:
+            current_session.reset(session_token)
+            self._superseded.discard(task)
+            if self._tasks.get(session_id) is task:
+                del self._tasks[session_id]
+
+    def active(self) -> int:
+        return len(self._tasks)
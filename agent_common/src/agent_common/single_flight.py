@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, AsyncIterator
+
+from agents import Model, ModelResponse
+
+
+# ------------------------------
+# Single-flight model calls
+# ------------------------------
+# When many sessions send the same prompt at the same moment (the opening
+# question of a chat, a retry storm), every one of them would make its own
+# upstream call. SingleFlightModel wraps a Model and lets concurrent identical
+# calls share one:
+#
+#   get_response     followers await the leader's call and get the same result
+#   stream_response  one upstream stream is buffered and fanned out; a session
+#                    that joins late first replays what was already streamed
+#
+# Calls are identical when everything that reaches the model is: instructions,
+# input, settings, tools, output schema, handoffs and the extra keyword
+# arguments. A call leaves the table as soon as it finishes, so this is not a
+# cache; answers are never reused after the fact.
+#
+# The upstream call runs in its own task. A session that gives up (cancelled
+# by a newer message) just stops waiting; the call is only cancelled when no
+# session waits for it any more.
+
+
+def request_key(*args: Any, **kwargs: Any) -> str:
+    # only compared within this process, so reprs of tools and settings are stable enough
+    raw = json.dumps([args, kwargs], default=repr, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class _Flight:
+    """One upstream call and the sessions waiting on it."""
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.waiters = 0
+        # streamed calls: events so far, and a condition to wait for more
+        self.events: list[Any] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.changed = asyncio.Condition()
+
+    def leave(self) -> None:
+        self.waiters -= 1
+        if self.waiters == 0 and self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+class SingleFlightModel(Model):
+    """
+    Model wrapper that collapses concurrent identical calls into one.
+    """
+
+    def __init__(self, inner: Model):
+        self.inner = inner
+        # model name, for metrics and cache keys that look at ``model.model``
+        self.model = getattr(inner, "model", type(inner).__name__)
+        self._responses: dict[str, _Flight] = {}
+        self._streams: dict[str, _Flight] = {}
+        self.upstream_calls = 0
+        self.shared_calls = 0
+
+    # ------------------------------
+    # get_response
+    # ------------------------------
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        key = request_key(*args, **kwargs)
+        flight = self._responses.get(key)
+        if flight is None:
+            flight = self._responses[key] = _Flight()
+            flight.task = asyncio.create_task(self._call(key, args, kwargs))
+            self.upstream_calls += 1
+        else:
+            self.shared_calls += 1
+
+        flight.waiters += 1
+        try:
+            # shield: a cancelled session must not cancel the call the others wait on
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.leave()
+
+    async def _call(self, key: str, args: tuple, kwargs: dict) -> ModelResponse:
+        try:
+            return await self.inner.get_response(*args, **kwargs)
+        finally:
+            self._responses.pop(key, None)
+
+    # ------------------------------
+    # stream_response
+    # ------------------------------
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        key = request_key(*args, **kwargs)
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = self._streams[key] = _Flight()
+            flight.task = asyncio.create_task(self._produce(key, flight, args, kwargs))
+            self.upstream_calls += 1
+        else:
+            self.shared_calls += 1
+
+        flight.waiters += 1
+        try:
+            seen = 0
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: len(flight.events) > seen or flight.done)
+                    batch = flight.events[seen:]
+                    finished = flight.done
+                seen += len(batch)
+                for event in batch:
+                    yield event
+                if finished and seen == len(flight.events):
+                    break
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            flight.leave()
+
+    async def _produce(self, key: str, flight: _Flight, args: tuple, kwargs: dict) -> None:
+        try:
+            async for event in self.inner.stream_response(*args, **kwargs):
+                async with flight.changed:
+                    flight.events.append(event)
+                    flight.changed.notify_all()
+        except BaseException as e:
+            flight.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            # new sessions start their own call from here on
+            self._streams.pop(key, None)
+            flight.done = True
+            async with flight.changed:
+                flight.changed.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "upstream_calls": self.upstream_calls,
+            "shared_calls": self.shared_calls,
+            "in_flight": len(self._responses) + len(self._streams),
+        }
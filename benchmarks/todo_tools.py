@@ -0,0 +1,235 @@
+"""
+Benchmark for the todo tools, without an LLM.
+
+Calls the tools of 06a_agent_tools_example_todos/main.py (JSON / SQLite todo
+store) and 06_tool_call/06c_mongodb_tool.py (MongoDB) the same way the agent
+runner does, through ``FunctionTool.on_invoke_tool`` with JSON arguments, so
+argument parsing and validation are part of every measurement.
+
+For every dataset size the store is first seeded directly (not timed), then
+each operation is called ``--ops`` times and its p50 / p99 latency and ops/s
+are reported. Results are written to a JSON file so runs can be compared.
+
+    python todo_tools.py --suite json --sizes 1000,100000,1000000
+    python todo_tools.py --suite mongo --sizes 1000,100000 --ops 500
+
+The Mongo suite expects a local mongod (MONGO_URL, default
+mongodb://localhost:27017) and works on its own database, todo_agent_bench,
+which is dropped before every size.
+"""
+import argparse
+import asyncio
+import dataclasses
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+JSON_TOOLS_DIR = ROOT / "06a_agent_tools_example_todos"
+MONGO_TOOLS_PATH = ROOT / "06_tool_call" / "06c_mongodb_tool.py"
+
+SEED_CHUNK = 10_000
+
+
+# ------------------------------
+# helpers
+# ------------------------------
+def load_module(name: str, path: Path):
+    """Import a script by path (the tool scripts live in folders that aren't packages)."""
+    # the scripts build their agent on import, the model itself is never called here
+    os.environ.setdefault("GOOGLE_API_KEY", "unused")
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def tool_caller(tool) -> Callable[[Dict[str, Any]], Awaitable[Any]]:
+    """Call a FunctionTool the way the runner does: a tool context and JSON arguments."""
+    from agents.tool_context import ToolContext
+
+    context_fields = {field.name for field in dataclasses.fields(ToolContext)}
+
+    async def call(arguments: Dict[str, Any]) -> Any:
+        raw = json.dumps(arguments)
+        kwargs = {"context": None, "tool_name": tool.name, "tool_call_id": "bench"}
+        # newer SDK versions also want the raw arguments on the context
+        if "tool_arguments" in context_fields:
+            kwargs["tool_arguments"] = raw
+        return await tool.on_invoke_tool(ToolContext(**kwargs), raw)
+
+    return call
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def measure(name: str, count: int, make_call: Callable[[int], Awaitable[Any]]) -> Dict[str, Any]:
+    """Run ``make_call(i)`` ``count`` times, one after the other, and summarise the latencies."""
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        await make_call(i)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    result = {
+        "operation": name,
+        "count": count,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4) if latencies else 0.0,
+        "ops_per_s": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+    print(f"  {name:<10} p50 {result['p50_ms']:>9.3f} ms   p99 {result['p99_ms']:>9.3f} ms   {result['ops_per_s']:>10.1f} ops/s")
+    return result
+
+
+# ------------------------------
+# JSON / SQLite todo tools
+# ------------------------------
+async def bench_json(sizes: List[int], ops: int, backend: str) -> List[Dict[str, Any]]:
+    os.environ["TODO_BACKEND"] = backend
+    tools = load_module("todo_tools_main", JSON_TOOLS_DIR / "main.py")
+    import todo_store
+
+    add = tool_caller(tools.add_todo)
+    search = tool_caller(tools.search_todos)
+    update = tool_caller(tools.update_todo)
+    delete = tool_caller(tools.delete_todo)
+    list_page = tool_caller(tools.list_todos)
+
+    runs = []
+    for size in sizes:
+        print(f"json ({backend}) with {size} todos")
+        with tempfile.TemporaryDirectory() as workdir:
+            # the tools open ./todo.log / ./todo.db, keep them in a scratch directory
+            os.chdir(workdir)
+            store = todo_store.open_store()
+            for start in range(0, size, SEED_CHUNK):
+                store.apply([
+                    {"op": "add", "todo": {"task": f"bench task {i} word{i % 97}", "completed": i % 2 == 0,
+                                           "priority": ("low", "medium", "high")[i % 3], "due_date": None}}
+                    for i in range(start, min(start + SEED_CHUNK, size))
+                ])
+
+            ids = random.sample(range(1, size + 1), min(2 * ops, size))
+            update_ids, delete_ids = ids[: len(ids) // 2], ids[len(ids) // 2:]
+            results = [
+                await measure("insert", ops, lambda i: add({"task": f"new task {i}", "priority": "high"})),
+                await measure("lookup", ops, lambda i: search({"query": f"word{random.randrange(97)}", "limit": 5})),
+                await measure("update", len(update_ids), lambda i: update({"id": str(update_ids[i]), "data": {"completed": True}})),
+                await measure("delete", len(delete_ids), lambda i: delete({"id": str(delete_ids[i])})),
+                await measure("list", ops, lambda i: list_page({"offset": random.randrange(max(size // 2, 1)), "limit": 20, "completed": False})),
+            ]
+            store.close()
+            todo_store._stores.clear()
+            os.chdir(ROOT)
+        runs.append({"suite": "json", "backend": backend, "size": size, "results": results})
+    return runs
+
+
+# ------------------------------
+# MongoDB todo tools
+# ------------------------------
+async def bench_mongo(sizes: List[int], ops: int) -> List[Dict[str, Any]]:
+    os.environ.setdefault("MONGO_DB", "todo_agent_bench")
+    tools = load_module("mongodb_tool", MONGO_TOOLS_PATH)
+
+    create = tool_caller(tools.create_todo)
+    fetch_one = tool_caller(tools.fetch_todo_by_title)
+    update = tool_caller(tools.update_todo_by_title)
+    delete = tool_caller(tools.delete_todo_by_title)
+    fetch_page = tool_caller(tools.fetch_todos)
+
+    runs = []
+    for size in sizes:
+        print(f"mongo with {size} todos")
+        collection = tools.mongo.get()[tools.MONGO_DB][tools.MONGO_COLLECTION]
+        await collection.drop()
+        tools._indexes_ready = False
+        tools.read_cache.invalidate_pages()
+        await tools.ensure_indexes(collection)
+
+        for start in range(0, size, SEED_CHUNK):
+            await collection.insert_many(
+                [{"title": f"bench-{i}", "description": f"bench task {i}"} for i in range(start, min(start + SEED_CHUNK, size))],
+                ordered=False,
+            )
+        # _ids to start pages from, so list calls land all over the collection
+        sample = await collection.aggregate([{"$sample": {"size": ops}}, {"$project": {"_id": 1}}])
+        page_starts = [str(doc["_id"]) async for doc in sample]
+
+        numbers = random.sample(range(size), min(2 * ops, size))
+        update_numbers, delete_numbers = numbers[: len(numbers) // 2], numbers[len(numbers) // 2:]
+        results = [
+            await measure("insert", ops, lambda i: create({"data": {"title": f"new-{size}-{i}", "description": "new"}})),
+            await measure("lookup", ops, lambda i: fetch_one({"title": f"bench-{random.randrange(size)}"})),
+            await measure("update", len(update_numbers), lambda i: update({"title": f"bench-{update_numbers[i]}", "new_description": "updated"})),
+            await measure("delete", len(delete_numbers), lambda i: delete({"title": f"bench-{delete_numbers[i]}"})),
+            await measure("list", len(page_starts), lambda i: fetch_page({"after": page_starts[i], "limit": 20})),
+        ]
+        runs.append({"suite": "mongo", "size": size, "results": results, "cache": tools.read_cache.stats()})
+
+    await collection.drop()
+    await tools.mongo.close()
+    return runs
+
+
+# ------------------------------
+# main
+# ------------------------------
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", choices=["json", "mongo", "all"], default="json")
+    parser.add_argument("--backend", choices=["log", "sqlite"], default="log", help="storage backend of the json suite")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="comma separated dataset sizes")
+    parser.add_argument("--ops", type=int, default=1000, help="calls per operation and size")
+    parser.add_argument("--cache", action="store_true", help="keep the Mongo read cache on (off by default so reads reach the database)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    # resolved now, the json suite changes the working directory while it runs
+    output = Path(args.output).resolve()
+    random.seed(args.seed)
+    if not args.cache:
+        os.environ["MONGO_CACHE_TTL_SECONDS"] = "0"
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    runs: List[Dict[str, Any]] = []
+    if args.suite in ("json", "all"):
+        runs += await bench_json(sizes, args.ops, args.backend)
+    if args.suite in ("mongo", "all"):
+        runs += await bench_mongo(sizes, args.ops)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ops": args.ops,
+        "seed": args.seed,
+        "runs": runs,
+    }
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
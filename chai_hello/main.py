@@ -1,26 +1,21 @@
 import chainlit as cl
-from agents import Agent,RunConfig,  Runner, AsyncOpenAI, OpenAIChatCompletionsModel, set_tracing_disabled
-import os
+from agents import Agent,RunConfig,  Runner, AsyncOpenAI, set_tracing_disabled
 from dotenv import load_dotenv
 import asyncio # for running asynchronous function
+from agent_common import AgentSummarizer, ConversationHistory, HedgedModel, SessionRuns, SingleFlightModel, cache_key, get_client, get_model, open_response_cache, stream_metrics
 
 load_dotenv()
-GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
 
-
-# client set up for connecting gemini
+# client set up for connecting gemini (one pooled client per process)
 #  LLM provider
-provider: AsyncOpenAI = AsyncOpenAI(
-    api_key= GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+provider: AsyncOpenAI = get_client()
 
 #LLM model 
-llm_model: OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-      model="gemini-2.5-flash",
-      openai_client= provider
-)
+#  calls still waiting after the p95 latency are hedged to gemini-2.0-flash, with failover when one trips its breaker
+routed_model: HedgedModel = HedgedModel(get_model("gemini-2.5-flash"), get_model("gemini-2.0-flash"))
+#  wrapped so identical requests from sessions at the same moment share one upstream call
+llm_model: SingleFlightModel = SingleFlightModel(routed_model)
 
 
 config =  RunConfig(
@@ -73,27 +68,45 @@ agent = Agent(
            model = llm_model
       )
 
+# a newer message of the same chat cancels the run still answering the previous one
+session_runs = SessionRuns()
+
+# answers to conversations seen before (RESPONSE_CACHE=1 turns it on), None when off
+response_cache = open_response_cache()
+
 # at the start of chat and creating history
 @cl.on_chat_start
 async def handle_chat_start():
-      cl.user_session.set("history" , [])
+      # only the recent turns that fit the token budget are kept, older ones are summarised in the background
+      cl.user_session.set("history" , ConversationHistory(summarizer=AgentSummarizer(llm_model)))
       await cl.Message(content = "Hello , I am Math Agnet , how can i help you today").send()
 
 
 #  getting response of agent in chainlit . when user send a message and response come (cl.on_message)
 @cl.on_message
 async def handle_message(message: cl.Message):
-      history = cl.user_session.get('history')
+    async with session_runs.latest(cl.context.session.id):
+      history: ConversationHistory = cl.user_session.get('history')
     #   append the message in the history .this is the message which user give to the llm
-      history.append({"role": "user" , "content": message.content})
-      result = await Runner.run(
-            agent,
-            input = history,
-      )
+      history.add_user(message.content)
+      messages = history.messages()
+      key = cache_key(agent, messages) if response_cache else None
+      # run time and how the run ended (ok / cached / error / cancelled) go to the metrics
+      with stream_metrics.start_run(agent) as run:
+            answer = await response_cache.get(key) if key else None
+            if answer is not None:
+                  run.finish("cached")
+            else:
+                  result = await Runner.run(
+                        agent,
+                        input = messages,
+                  )
+                  answer = result.final_output
+                  if key:
+                        await response_cache.set(key, answer)
         #   append the message in the history .this is the message which llm give to the user
-      history.append({"role": "assistant" , "content": result.final_output})
-      cl.user_session.set("history" , history)
-      await cl.Message(content = result.final_output).send()
+      history.add_assistant(answer)
+      await cl.Message(content = answer).send()
 # @cl.on_message
 # async def main(message: str):
 #     # Just echo the message for now
@@ -1,24 +1,14 @@
-from agents import Agent, Runner, AsyncOpenAI, OpenAIChatCompletionsModel , RunConfig
-import os
+from agents import Agent, Runner, RunConfig
+from agent_common import get_model
 from dotenv import load_dotenv
 from pydantic import BaseModel
 import asyncio
 
 # 🔑 Load API key
 load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-# 🔗 External client for Gemini
-external_client = AsyncOpenAI(
-    api_key=GOOGLE_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
 
 # 🎯 Choose the LLM model
-llm_model = OpenAIChatCompletionsModel(
-    model="gemini-2.5-flash",
-    openai_client=external_client,
-)
+llm_model = get_model("gemini-2.5-flash")
 
 # ⚙️ Configure runner with the chosen model
 config = RunConfig(
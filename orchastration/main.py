@@ -1,25 +1,14 @@
-from agents import Agent ,Runner , AsyncOpenAI, OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,RunContextWrapper,  function_tool
+from agents import Agent ,Runner , OpenAIChatCompletionsModel, RunConfig, ItemHelpers ,RunContextWrapper,  function_tool
+from agent_common import get_model
 from pydantic import BaseModel
 from dataclasses import dataclass
 from dotenv import load_dotenv
-import os
 
 
 load_dotenv()
 
-# Load Gemini API key
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-externel_client : AsyncOpenAI= AsyncOpenAI(
-     api_key= GOOGLE_API_KEY,
-     base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-) 
-
-
-llm_model : OpenAIChatCompletionsModel = OpenAIChatCompletionsModel(
-       model="gemini-2.5-flash",
-      openai_client= externel_client
-)
+llm_model : OpenAIChatCompletionsModel = get_model("gemini-2.5-flash")
 
 # here if we do not provide the user info it will not give us weather .
 